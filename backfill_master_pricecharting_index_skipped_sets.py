@@ -1,22 +1,38 @@
+import asyncio
 import csv
+import gzip
+import logging
 import os
 import time
 import sqlite3
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+from selectolax.parser import HTMLParser
 
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+log = logging.getLogger(__name__)
 
 # -----------------------
 # SQLite
 # -----------------------
 
+# Commit once per this many scraped sets (plus once at the end), not per set.
+COMMIT_EVERY_SETS = 100
+
 def init_db(db_path="pricecharting.db"):
     con = sqlite3.connect(db_path)
     cur = con.cursor()
+    # bulk-write tuning: WAL + relaxed sync, temp tables and a ~200MB page cache in memory
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA cache_size=-200000")
+    cur.execute("PRAGMA mmap_size=268435456")
     cur.execute("""
     CREATE TABLE IF NOT EXISTS cards (
         card_url TEXT PRIMARY KEY,
@@ -31,6 +47,17 @@ def init_db(db_path="pricecharting.db"):
     )
     """)
     cur.execute("CREATE INDEX IF NOT EXISTS idx_cards_number ON cards(card_number)")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS scrape_cache (
+        set_url TEXT PRIMARY KEY,
+        fetched_at INTEGER,
+        html_gz BLOB
+    )
+    """)
+    # set_slug is not in the base schema above; index it when the column exists
+    cur.execute("PRAGMA table_info(cards)")
+    if "set_slug" in {r[1] for r in cur.fetchall()}:
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_cards_set_slug ON cards(set_slug)")
     con.commit()
     return con
 
@@ -50,14 +77,78 @@ def upsert_cards(con, rows):
         ungraded_price=excluded.ungraded_price,
         grade9_price=excluded.grade9_price,
         psa10_price=excluded.psa10_price
+    -- skip the row write entirely when nothing changed (re-runs stay out of the WAL)
+    WHERE cards.ungraded_price IS NOT excluded.ungraded_price
+       OR cards.grade9_price IS NOT excluded.grade9_price
+       OR cards.psa10_price IS NOT excluded.psa10_price
+       OR cards.image_url IS NOT excluded.image_url
+       OR cards.card_name IS NOT excluded.card_name
+       OR cards.card_number IS NOT excluded.card_number
+       OR cards.product_id IS NOT excluded.product_id
+       OR cards.set_url IS NOT excluded.set_url
     """, rows)
-    con.commit()
+
+
+# Scraped set HTML younger than this is re-parsed from scrape_cache instead of re-scraped.
+SCRAPE_CACHE_TTL_S = 24 * 3600
+
+def get_cached_html(con, set_url: str, max_age_s: int = SCRAPE_CACHE_TTL_S) -> str | None:
+    cur = con.cursor()
+    cur.execute(
+        "SELECT html_gz FROM scrape_cache WHERE set_url=? AND fetched_at > ?",
+        (set_url, int(time.time()) - max_age_s),
+    )
+    row = cur.fetchone()
+    return gzip.decompress(row[0]).decode("utf-8") if row else None
+
+def put_cached_html(con, set_url: str, html_gz: bytes):
+    """html_gz is gzip-compressed UTF-8 HTML (~10x smaller than the raw page)."""
+    con.execute(
+        "INSERT OR REPLACE INTO scrape_cache (set_url, fetched_at, html_gz) VALUES (?, ?, ?)",
+        (set_url, int(time.time()), html_gz),
+    )
+
+# rows per executemany flush: big enough that a flush spans many small sets,
+# small enough to keep the pending buffer and each write burst modest
+UPSERT_BATCH_ROWS = 891
+
+class CardBatchWriter:
+    """
+    Buffers parsed card rows across sets and upserts them in batches of
+    UPSERT_BATCH_ROWS, so many small sets share one executemany.
+    """
+    def __init__(self, con, batch_rows: int = UPSERT_BATCH_ROWS):
+        self.con = con
+        self.batch_rows = batch_rows
+        self._pending: list[tuple] = []
+
+    def add(self, rows: list[tuple]):
+        self._pending.extend(rows)
+        if len(self._pending) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            upsert_cards(self.con, self._pending)
+            self._pending = []
+
+    def commit(self):
+        self.flush()
+        self.con.commit()
 
 
 # -----------------------
 # Selenium (Option A)
 # -----------------------
 
+# Images, fonts, CSS and trackers: nothing the games_table rows depend on.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+    "*.woff", "*.woff2", "*.ttf",
+    "*.css",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*", "*tiktok*",
+]
+
 def make_chrome_driver(chromedriver_path: str, headless: bool = False, chrome_binary: str | None = None):
     opts = Options()
     if headless:
@@ -70,45 +161,142 @@ def make_chrome_driver(chromedriver_path: str, headless: bool = False, chrome_bi
     opts.add_argument("--disable-background-timer-throttling")
     opts.add_argument("--disable-renderer-backgrounding")
     opts.add_argument("--disable-features=Translate,BackForwardCache,AcceptCHFrame")
-    opts.add_argument("--blink-settings=imagesEnabled=false")  # huge win
 
     # If you’re using a non-system Chrome (like chrome-for-testing zip), set this:
     if chrome_binary:
         opts.binary_location = chrome_binary
 
-    return webdriver.Chrome(service=Service(chromedriver_path), options=opts)
-
-def fetch_full_set_html_by_scrolling(driver, set_url: str, max_scrolls: int = 250, settle_rounds: int = 6):
+    driver = webdriver.Chrome(service=Service(chromedriver_path), options=opts)
+
+    # Drop non-essential requests at the network layer (blink imagesEnabled=false
+    # only skipped rendering; the bytes were still fetched).
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+# Installed once per page load: the browser keeps window.__rc current as rows
+# are appended, so each poll is a tiny scalar read rather than a DOM query.
+INSTALL_ROW_OBSERVER_JS = """
+const sel = 'table#games_table tbody tr[data-product]';
+window.__rc = document.querySelectorAll(sel).length;
+new MutationObserver(() => {
+    window.__rc = document.querySelectorAll(sel).length;
+}).observe(document.body, {childList: true, subtree: true});
+"""
+
+def _row_count(driver) -> int:
+    return driver.execute_script("return window.__rc || 0;")
+
+def fetch_full_set_html_by_scrolling(
+    driver,
+    set_url: str,
+    max_scrolls: int = 250,
+    settle_rounds: int = 6,
+    scroll_timeout: float = 5.0,
+):
     """
     Loads set_url and scrolls until row count stops increasing.
+    After each scroll we wait only until new rows appear (polling every 250ms),
+    up to scroll_timeout; a scroll that adds nothing counts as a settle round.
     """
-    print("get_url")
+    log.debug("get %s", set_url)
     driver.get(set_url)
-    time.sleep(2.0)
+    driver.execute_script(INSTALL_ROW_OBSERVER_JS)
+    try:
+        WebDriverWait(driver, scroll_timeout, poll_frequency=0.25).until(lambda d: _row_count(d) > 0)
+    except TimeoutException:
+        pass  # empty set page; the scroll loop below settles immediately
 
-    last_count = -1
     stable = 0
-
     for _ in range(max_scrolls):
-        rows = driver.find_elements(By.CSS_SELECTOR, "table#games_table tbody tr[data-product]")
-        count = len(rows)
-        print(count)
+        prev = _row_count(driver)
+        log.debug("rows=%d", prev)
 
-        if count == last_count:
-            stable += 1
-        else:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        log.debug("scrolling ...")
+        try:
+            WebDriverWait(driver, scroll_timeout, poll_frequency=0.25).until(
+                lambda d: _row_count(d) != prev
+            )
             stable = 0
-            last_count = count
+        except TimeoutException:
+            stable += 1
+            if stable >= settle_rounds:
+                break
 
-        if stable >= settle_rounds:
-            break
+    return driver.page_source
 
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        print("scrolling ...")
-        time.sleep(5.0)
-        print("waiting ...")
 
-    return driver.page_source
+def make_scrape_driver(chromedriver_path: str, headless: bool, chrome_binary: str | None):
+    log.debug("creating the chromedriver")
+    driver = make_chrome_driver(chromedriver_path, headless=headless, chrome_binary=chrome_binary)
+    # timeouts (important)
+    driver.set_page_load_timeout(120)
+    driver.set_script_timeout(120)
+    return driver
+
+
+def _driver_alive(driver) -> bool:
+    """
+    True if the browser session behind driver still answers commands.
+    """
+    if driver is None or not driver.session_id:
+        return False
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+
+def _quit_driver(driver):
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def scrape_set(driver, set_url: str) -> str:
+    """
+    Scrape one set with an already-running driver (no Chrome startup cost).
+    On failure, clears cookies so the next set starts clean, then re-raises.
+    """
+    try:
+        return fetch_full_set_html_by_scrolling(driver, set_url, max_scrolls=20, settle_rounds=1)
+    except Exception:
+        try:
+            driver.delete_all_cookies()
+        except WebDriverException:
+            pass
+        raise
+
+
+def scrape_set_reusing_driver(driver, set_url: str, chromedriver_path: str, headless: bool, chrome_binary: str | None):
+    """
+    Scrape set_url with the shared driver (launching it if needed), falling back
+    to cold-start retries on failure.
+    Returns (driver, html); driver is None if its session died and must be relaunched.
+    """
+    if driver is None:
+        driver = make_scrape_driver(chromedriver_path, headless=headless, chrome_binary=chrome_binary)
+    try:
+        return driver, scrape_set(driver, set_url)
+    except Exception as e:
+        print(f"  shared driver failed: {e}")
+        # only relaunch the shared driver if its session is gone
+        if not _driver_alive(driver):
+            _quit_driver(driver)
+            driver = None
+        html = scrape_set_with_retry(
+            set_url=set_url,
+            chromedriver_path=chromedriver_path,
+            headless=headless,
+            chrome_binary=chrome_binary,
+            max_attempts=3,
+        )
+        return driver, html
 
 
 def scrape_set_with_retry(
@@ -118,17 +306,16 @@ def scrape_set_with_retry(
     chrome_binary: str | None,
     max_attempts: int = 3
 ):
+    """
+    Cold-start path: fresh Chrome per attempt. Used only when the shared driver fails.
+    """
     last_err = None
     for attempt in range(1, max_attempts + 1):
-        print("creating the chromedriver")
-        driver = make_chrome_driver(chromedriver_path, headless=headless, chrome_binary=chrome_binary)
+        driver = make_scrape_driver(chromedriver_path, headless=headless, chrome_binary=chrome_binary)
         try:
-            # timeouts (important)
-            print("loading page...")
-            driver.set_page_load_timeout(120)
-            driver.set_script_timeout(120)
+            log.debug("loading page ...")
             html = fetch_full_set_html_by_scrolling(driver, set_url, max_scrolls=20, settle_rounds=1)
-            print(html)
+            log.debug("html len=%d", len(html))
             return html
         except Exception as e:
             last_err = e
@@ -147,46 +334,180 @@ def scrape_set_with_retry(
 
     raise last_err
 
+# -----------------------
+# Worker pool (one persistent driver per process)
+# -----------------------
+
+_worker_config = None
+_worker_driver = None
+
+def _quit_worker_driver():
+    global _worker_driver
+    _quit_driver(_worker_driver)
+    _worker_driver = None
+
+def _init_scrape_worker(chromedriver_path: str, headless: bool, chrome_binary: str | None):
+    global _worker_config
+    _worker_config = (chromedriver_path, headless, chrome_binary)
+    # pool workers skip atexit; multiprocessing finalizers still run on shutdown
+    Finalize(None, _quit_worker_driver, exitpriority=10)
+
+def _scrape_set_in_worker(set_url: str) -> tuple[list[tuple], bytes]:
+    """
+    Runs inside a pool process. Returns parsed card rows (picklable tuples) and
+    the gzipped HTML for scrape_cache; the DB connection stays in the main process.
+    """
+    global _worker_driver
+    chromedriver_path, headless, chrome_binary = _worker_config
+    _worker_driver, html = scrape_set_reusing_driver(
+        _worker_driver, set_url, chromedriver_path, headless, chrome_binary
+    )
+    time.sleep(0.8)  # per-worker politeness
+    return parse_cards_from_html(set_url, html), gzip.compress(html.encode("utf-8"))
+
+def _scrape_sets_in_pool(
+    writer: CardBatchWriter,
+    skipped: list[dict],
+    workers: int,
+    chromedriver_path: str,
+    headless: bool,
+    chrome_binary: str | None,
+):
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_scrape_worker,
+        initargs=(chromedriver_path, headless, chrome_binary),
+    ) as ex:
+        futures = {ex.submit(_scrape_set_in_worker, s["set_url"]): s for s in skipped}
+        for idx, fut in enumerate(as_completed(futures), start=1):
+            s = futures[fut]
+            try:
+                cards, html_gz = fut.result()
+                put_cached_html(writer.con, s["set_url"], html_gz)
+                writer.add(cards)
+                print(f"[{idx}/{len(skipped)}] {s['set_name']} ({s['set_slug']}) +{len(cards)} cards")
+            except Exception as e:
+                print(f"[{idx}/{len(skipped)}] {s['set_name']} ({s['set_slug']}) ERROR: {e}")
+
+            if idx % COMMIT_EVERY_SETS == 0:
+                writer.commit()
+
+# -----------------------
+# Playwright (Option B)
+# -----------------------
+
+PLAYWRIGHT_BLOCKED_TYPES = {"image", "font", "stylesheet", "media"}
+
+# Scrolls until the row count stops growing, entirely inside the page:
+# one evaluate() round-trip per set instead of one WebDriver call per scroll.
+SCROLL_UNTIL_STABLE_JS = """
+async () => {
+    let n = -1;
+    while (true) {
+        const c = document.querySelectorAll('table#games_table tbody tr[data-product]').length;
+        if (c === n) break;
+        n = c;
+        window.scrollTo(0, document.body.scrollHeight);
+        await new Promise(r => setTimeout(r, 800));
+    }
+    return n;
+}
+"""
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in PLAYWRIGHT_BLOCKED_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def async_playwright_scrape(browser, set_url: str) -> str:
+    """
+    Loads set_url in a fresh page on an already-launched Chromium and returns
+    the fully scrolled HTML.
+    """
+    page = await browser.new_page()
+    try:
+        await page.route("**/*", _block_heavy_resources)
+        await page.goto(set_url, wait_until="domcontentloaded", timeout=120_000)
+        count = await page.evaluate(SCROLL_UNTIL_STABLE_JS)
+        log.debug("rows loaded: %d", count)
+        return await page.content()
+    finally:
+        await page.close()
+
+async def _scrape_sets_with_playwright(writer: CardBatchWriter, skipped: list[dict], headless: bool):
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        try:
+            for idx, s in enumerate(skipped, start=1):
+                set_url = s["set_url"]
+                print(f"[{idx}/{len(skipped)}] {s['set_name']} ({s['set_slug']}) | {set_url}")
+
+                try:
+                    html = await async_playwright_scrape(browser, set_url)
+                    put_cached_html(writer.con, set_url, gzip.compress(html.encode("utf-8")))
+                    cards = parse_cards_from_html(set_url, html)
+                    writer.add(cards)
+                    print(f"  +{len(cards)} cards")
+                except Exception as e:
+                    print(f"  ERROR: {e}")
+
+                if idx % COMMIT_EVERY_SETS == 0:
+                    writer.commit()
+                await asyncio.sleep(0.8)
+        finally:
+            await browser.close()
+
 # -----------------------
 # Parse HTML -> rows
 # -----------------------
 
+# One C-level pass deletes "$", "," and whitespace
+_PRICE_TRANS = str.maketrans("", "", "$, \t\n\r")
+
 def _parse_price(text: str):
     if not text:
         return None
-    txt = text.replace("$", "").replace(",", "").strip()
+    txt = text.translate(_PRICE_TRANS)
+    # placeholders like "-" / "N/A" are rejected without raising
+    if not txt or txt[0] not in "0123456789.":
+        return None
     try:
         return float(txt)
-    except:
+    except ValueError:
         return None
 
+def _price_at(tr, selector: str):
+    el = tr.css_first(selector)
+    return _parse_price(el.text(strip=True) if el else "")
+
 def parse_cards_from_html(set_url: str, html: str):
-    soup = BeautifulSoup(html, "html.parser")
-    table = soup.select_one("table#games_table")
-    if not table:
+    tree = HTMLParser(html)
+    table = tree.css_first("table#games_table")
+    if table is None:
         return []
 
     out = []
-    for tr in table.select("tbody tr[data-product]"):
-        product_id = (tr.get("data-product") or "").strip()
-
-        a = tr.select_one("td.title a[href]")
-        if not a:
+    for tr in table.css("tbody tr[data-product]"):
+        # required cell first: skip the row before any other selector runs
+        a = tr.css_first("td.title a[href]")
+        if a is None:
             continue
 
-        card_text = a.get_text(" ", strip=True)  # "Gardevoir ex #245"
-        href = (a.get("href") or "").strip()
+        product_id = (tr.attributes.get("data-product") or "").strip()
+
+        card_text = a.text(separator=" ", strip=True)  # "Gardevoir ex #245"
+        href = (a.attributes.get("href") or "").strip()
         card_url = href if href.startswith("http") else f"https://www.pricecharting.com{href}"
 
-        img = tr.select_one("td.image img")
-        image_url = (img.get("src") or "").strip() if img else ""
+        img = tr.css_first("td.image img")
+        image_url = (img.attributes.get("src") or "").strip() if img is not None else ""
 
-        ungraded = _parse_price(tr.select_one("td.used_price span.js-price").get_text(strip=True)
-                               if tr.select_one("td.used_price span.js-price") else "")
-        grade9 = _parse_price(tr.select_one("td.cib_price span.js-price").get_text(strip=True)
-                             if tr.select_one("td.cib_price span.js-price") else "")
-        psa10 = _parse_price(tr.select_one("td.new_price span.js-price").get_text(strip=True)
-                            if tr.select_one("td.new_price span.js-price") else "")
+        ungraded = _price_at(tr, "td.used_price span.js-price")
+        grade9 = _price_at(tr, "td.cib_price span.js-price")
+        psa10 = _price_at(tr, "td.new_price span.js-price")
 
         card_name, card_number = card_text, ""
         if " #" in card_text:
@@ -211,17 +532,38 @@ def _slug_from_set_url(set_url: str) -> str:
       https://www.pricecharting.com/console/pokemon-151
     We treat the last path segment as the set_slug.
     """
-    path = urlparse(set_url).path.strip("/")
-    return path.split("/")[-1] if path else ""
+    if not set_url:
+        return ""
+    return set_url.partition("?")[0].partition("#")[0].rstrip("/").rpartition("/")[2]
 
-def _get_existing_set_slugs_from_cards(con) -> set[str]:
+def _find_skipped_sets(con, all_sets: list[dict], skip_japanese: bool) -> list[dict]:
     """
-    Pull distinct set_slug values that are already present in the cards table.
+    CSV sets whose slug has no rows in cards yet, in CSV order.
+    The membership test runs in SQLite (idx_cards_set_slug probe per slug)
+    instead of pulling every distinct slug into a Python set.
     (Assumes your cards table has a set_slug column.)
     """
     cur = con.cursor()
-    cur.execute("SELECT DISTINCT set_slug FROM cards WHERE set_slug IS NOT NULL AND set_slug != ''")
-    return {r[0] for r in cur.fetchall()}
+    cur.execute("DROP TABLE IF EXISTS temp.tmp_sets")
+    cur.execute("CREATE TEMP TABLE tmp_sets (set_slug TEXT, set_url TEXT, set_name TEXT)")
+    cur.executemany(
+        "INSERT INTO tmp_sets (set_slug, set_url, set_name) VALUES (?, ?, ?)",
+        [(s["set_slug"], s["set_url"], s["set_name"]) for s in all_sets if s["set_slug"]],
+    )
+
+    sql = """
+        SELECT t.set_slug, t.set_url, t.set_name
+        FROM tmp_sets t
+        WHERE NOT EXISTS (SELECT 1 FROM cards c WHERE c.set_slug = t.set_slug)
+    """
+    if skip_japanese:
+        sql += " AND t.set_name NOT LIKE '%japanese%'"  # LIKE is case-insensitive for ASCII
+    sql += " ORDER BY t.rowid"
+
+    return [
+        {"set_slug": slug, "set_url": url, "set_name": name}
+        for slug, url, name in cur.execute(sql)
+    ]
 
 def build_db_from_sets_csv(
     sets_csv: str = "pricecharting_sets.csv",
@@ -232,15 +574,14 @@ def build_db_from_sets_csv(
     limit_sets: int | None = None,
     start_at: int | None = None,          # optional index-based start within the *skipped list*
     skip_japanese: bool = True,
+    backend: str = "selenium",            # "selenium" or "playwright"
+    workers: int = 1,                     # >1 scrapes with a process pool (selenium only)
 ):
     con = init_db(db_path)
+    writer = CardBatchWriter(con)
 
     try:
-        # 1) What do we already have in the DB?
-        existing_slugs = _get_existing_set_slugs_from_cards(con)
-        print(f"DB has cards for {len(existing_slugs)} set_slugs")
-
-        # 2) Load CSV sets and compute which ones were skipped
+        # 1) Load CSV sets
         all_sets = []
         with open(sets_csv, newline="", encoding="utf-8") as f:
             reader = csv.DictReader(f)
@@ -257,17 +598,8 @@ def build_db_from_sets_csv(
                     "set_name": set_name,
                 })
 
-        # Only those whose slug is NOT in DB
-        skipped = [s for s in all_sets if s["set_slug"] and s["set_slug"] not in existing_slugs]
-
-        # Optional: skip Japanese by name
-        if skip_japanese:
-            skipped_non_jp = []
-            for s in skipped:
-                if "japanese" in (s["set_name"] or "").lower():
-                    continue
-                skipped_non_jp.append(s)
-            skipped = skipped_non_jp
+        # 2) Only those whose slug is NOT in DB (optionally skipping Japanese by name)
+        skipped = _find_skipped_sets(con, all_sets, skip_japanese)
 
         print(f"CSV has {len(all_sets)} sets")
         print(f"Skipped sets to scrape: {len(skipped)}")
@@ -280,34 +612,62 @@ def build_db_from_sets_csv(
         if limit_sets is not None:
             skipped = skipped[:limit_sets]
 
-        # 5) Scrape only skipped sets
-        for idx, s in enumerate(skipped, start=1):
-            set_url = s["set_url"]
-            set_name = s["set_name"]
-            set_slug = s["set_slug"]
-
-            print(f"[{idx}/{len(skipped)}] {set_name} ({set_slug}) | {set_url}")
-
-            try:
-                html = scrape_set_with_retry(
-                    set_url=set_url,
-                    chromedriver_path=chromedriver_path,
-                    headless=headless,
-                    chrome_binary=chrome_binary,
-                    max_attempts=3,
-                )
-                cards = parse_cards_from_html(set_url, html)
-                upsert_cards(con, cards)
-                print(f"  +{len(cards)} cards")
-            except Exception as e:
-                print(f"  ERROR: {e}")
-
-            time.sleep(0.8)
+        # 5) Sets with a fresh cached page never touch a browser
+        to_scrape = []
+        for s in skipped:
+            html = get_cached_html(con, s["set_url"])
+            if html is None:
+                to_scrape.append(s)
+                continue
+            cards = parse_cards_from_html(s["set_url"], html)
+            writer.add(cards)
+            print(f"[cache] {s['set_name']} ({s['set_slug']}) +{len(cards)} cards")
+        skipped = to_scrape
+
+        if backend == "playwright":
+            asyncio.run(_scrape_sets_with_playwright(writer, skipped, headless=headless))
+            return
+
+        if workers > 1:
+            _scrape_sets_in_pool(writer, skipped, workers, chromedriver_path, headless, chrome_binary)
+            return
+
+        # 6) Scrape only skipped sets, reusing one Chrome across all of them
+        driver = None
+        try:
+            for idx, s in enumerate(skipped, start=1):
+                set_url = s["set_url"]
+                set_name = s["set_name"]
+                set_slug = s["set_slug"]
+
+                print(f"[{idx}/{len(skipped)}] {set_name} ({set_slug}) | {set_url}")
+
+                try:
+                    driver, html = scrape_set_reusing_driver(
+                        driver, set_url, chromedriver_path, headless, chrome_binary
+                    )
+                    put_cached_html(con, set_url, gzip.compress(html.encode("utf-8")))
+                    cards = parse_cards_from_html(set_url, html)
+                    writer.add(cards)
+                    print(f"  +{len(cards)} cards")
+                except Exception as e:
+                    print(f"  ERROR: {e}")
+
+                if idx % COMMIT_EVERY_SETS == 0:
+                    writer.commit()
+                time.sleep(0.8)
+        finally:
+            _quit_driver(driver)
 
     finally:
+        # final flush + commit for whatever is left (also keeps progress on Ctrl-C)
+        writer.commit()
         con.close()
 
 if __name__ == "__main__":
+    # INFO by default; switch to DEBUG to trace scrolling/driver lifecycle
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # EDIT THESE PATHS:
     CHROMEDRIVER_PATH =  "chromedriver-linux64/chromedriver"  # <-- change to your actual path
 
@@ -322,5 +682,6 @@ if __name__ == "__main__":
         headless=True,
         chrome_binary=CHROME_BINARY,
         limit_sets=None,  # set to 5 for a quick test
+        workers=1,        # e.g. 4 to run four Chrome processes in parallel
     )
 
@@ -1,25 +1,43 @@
 import re
-import time
 import sqlite3
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rate_limiter import RateLimiter
 
 DB="pricecharting.db"
 HEADERS={"User-Agent":"Mozilla/5.0","Accept-Language":"en-US,en;q=0.9"}
+MAX_WORKERS = 8
+REQUESTS_PER_SEC = 3.0  # global politeness cap across all workers
+FLUSH_EVERY = 50  # fetched codes per executemany + commit
+
+# One keep-alive pool for every fetch (TLS handshake paid once per connection,
+# not per request), sized for the worker threads, with retry/backoff on 429/5xx.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+# <img class="set-logo" alt="Set Code: JTG" ...>, attributes in any order.
+# Matched on the raw response bytes: no decode, no parse tree.
+_SET_LOGO_TAG_RE = re.compile(rb"<img\b[^>]*\bset-logo\b[^>]*>", re.IGNORECASE)
+_SET_CODE_RE = re.compile(rb'\b(?:alt|title)\s*=\s*["\']Set Code:\s*([A-Z0-9\-]+)')
 
 def fetch_set_code(set_url: str) -> str | None:
-    r = requests.get(set_url, headers=HEADERS, timeout=30)
+    r = SESSION.get(set_url, timeout=30)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
 
-    img = soup.select_one("img.set-logo[alt^='Set Code:'], img.set-logo[title^='Set Code:']")
-    if not img:
-        return None
-
-    txt = img.get("alt") or img.get("title") or ""
-    # "Set Code: JTG" -> "JTG"
-    m = re.search(r"Set Code:\s*([A-Z0-9\-]+)", txt)
-    return m.group(1).strip() if m else None
+    for tag in _SET_LOGO_TAG_RE.finditer(r.content):
+        # "Set Code: JTG" -> "JTG"
+        m = _SET_CODE_RE.search(tag.group(0))
+        if m:
+            return m.group(1).decode("ascii")
+    return None
 
 def main():
     con = sqlite3.connect(DB)
@@ -34,32 +52,54 @@ def main():
     set_urls = [r[0] for r in cur.fetchall()]
     print("Distinct sets:", len(set_urls))
 
-    # Build mapping set_url -> set_code
-    for i, set_url in enumerate(set_urls, start=1):
-        # skip if already filled (fast resume)
-        cur.execute("SELECT 1 FROM cards WHERE set_url=? AND set_code IS NOT NULL AND set_code != '' LIMIT 1", (set_url,))
-        if cur.fetchone() or "japanese" in set_url:
-            continue
+    # skip if already filled (fast resume)
+    cur.execute("SELECT DISTINCT set_url FROM cards WHERE set_code IS NOT NULL AND set_code != ''")
+    done = {r[0] for r in cur.fetchall()}
+    todo = [u for u in set_urls if u not in done and "japanese" not in u]
+    print("To fetch:", len(todo))
 
-        try:
-            code = fetch_set_code(set_url)
-            if not code:
-                print(f"[{i}] NO SET CODE FOUND: {set_url}")
-                continue
+    limiter = RateLimiter(REQUESTS_PER_SEC)
 
-            cur.execute("UPDATE cards SET set_code=? WHERE set_url=?", (code, set_url))
-            con.commit()
-            print(f"[{i}] {code}  <- {set_url}")
+    def fetch(set_url):
+        limiter.acquire()
+        return fetch_set_code(set_url)
 
-            time.sleep(0.3)  # be polite
+    # Build mapping set_url -> set_code. Codes are written in batches of
+    # FLUSH_EVERY (one executemany + commit each); the finally flushes the rest,
+    # so a crash or Ctrl-C keeps everything fetched so far.
+    pairs = []
+    updated = 0
 
-        except Exception as e:
-            print(f"[{i}] ERROR {set_url}: {e}")
-            time.sleep(1.0)
+    def flush():
+        nonlocal updated
+        if pairs:
+            cur.executemany("UPDATE cards SET set_code=? WHERE set_url=?", pairs)
+            updated += len(pairs)
+            pairs.clear()
+        con.commit()
 
-    con.close()
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+            futures = {ex.submit(fetch, u): u for u in todo}
+            for i, fut in enumerate(as_completed(futures), start=1):
+                set_url = futures[fut]
+                try:
+                    code = fut.result()
+                except Exception as e:
+                    print(f"[{i}] ERROR {set_url}: {e}")
+                    continue
+                if not code:
+                    print(f"[{i}] NO SET CODE FOUND: {set_url}")
+                    continue
+                pairs.append((code, set_url))
+                print(f"[{i}] {code}  <- {set_url}")
+                if len(pairs) >= FLUSH_EVERY:
+                    flush()
+    finally:
+        flush()
+        con.close()
+    print(f"Updated {updated} sets.")
     print("Done.")
 
 if __name__ == "__main__":
     main()
-
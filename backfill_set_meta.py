@@ -39,30 +39,35 @@ def load_denoms_csv(path: str):
       - titles that include trailing " Set"
       - titles without it
     """
+    by_title = {}
     with open(path, "r", encoding="utf-8-sig", newline="") as f:
         r = csv.DictReader(f)
         headers = r.fieldnames or []
-        rows = list(r)
-
-    # Find title column
-    title_candidates = ["title", "set_title", "set", "name", "pokellector_set_name"]
-    title_col = next((c for c in title_candidates if c in headers), None)
-    if not title_col:
-        raise RuntimeError(f"Could not find title column in {path}. Headers: {headers}")
 
-    by_title = {}
-    for row in rows:
-        t = (row.get(title_col) or "").strip()
-        if not t:
-            continue
-        by_title[t] = row
+        # Find title column
+        title_candidates = ["title", "set_title", "set", "name", "pokellector_set_name"]
+        title_col = next((c for c in title_candidates if c in headers), None)
+        if not title_col:
+            raise RuntimeError(f"Could not find title column in {path}. Headers: {headers}")
+
+        # Single streaming pass. Each row is keyed by its exact title plus the
+        # with/without " Set" variants, so callers need only one lookup.
+        # Exact titles always win over variants.
+        for row in r:
+            t = (row.get(title_col) or "").strip()
+            if not t:
+                continue
+            by_title[t] = row
+            short = strip_set_suffix(t)
+            by_title.setdefault(short, row)
+            by_title.setdefault(f"{short} Set", row)
 
     return by_title, headers, title_col
 
 
 def main():
     poke_by_title, headers, title_col = load_denoms_csv(DENOMS_CSV)
-    print(f"Loaded {len(poke_by_title)} pokellector rows. title_col={title_col}")
+    print(f"Loaded {len(poke_by_title)} pokellector title keys. title_col={title_col}")
 
     con = sqlite3.connect(DB_PATH)
     try:
@@ -91,9 +96,9 @@ def main():
         cur.execute(f"SELECT set_slug FROM {TABLE} WHERE set_slug IS NOT NULL AND set_slug != ''")
         slugs_in_db = set(r[0] for r in cur.fetchall())
 
-        updated = 0
         miss_slug = []
         miss_title = []
+        meta_rows = []
 
         for pc_slug, pok_title in SET_MAP.items():
             if pc_slug not in slugs_in_db:
@@ -101,9 +106,6 @@ def main():
                 continue
 
             row = poke_by_title.get(pok_title)
-            if row is None:
-                row = poke_by_title.get(strip_set_suffix(pok_title))
-
             if row is None:
                 miss_title.append((pc_slug, pok_title))
                 continue
@@ -115,33 +117,49 @@ def main():
             released_raw = first_nonempty(row.get("released_raw"), row.get("released_raw_text"))
             pok_url = first_nonempty(row.get("pokellector_url"), row.get("url"), row.get("href"), row.get("set_url"))
 
-            cur.execute(
-                f"""
-                UPDATE {TABLE}
-                SET
-                    pokellector_set_name = ?,
-                    pokellector_url = COALESCE(?, pokellector_url),
-                    base_total = COALESCE(?, base_total),
-                    secret_total = COALESCE(?, secret_total),
-                    released_md = COALESCE(?, released_md),
-                    released_year = COALESCE(?, released_year),
-                    released_raw = COALESCE(?, released_raw),
-                    language = COALESCE(?, language)
-                WHERE set_slug = ?
-                """,
-                (
-                    pok_title,        # store EXACT mapping value
-                    pok_url,
-                    base_total,
-                    secret_total,
-                    released_md,
-                    released_year,
-                    released_raw,
-                    "English",
-                    pc_slug,
-                )
+            meta_rows.append((
+                pc_slug,
+                pok_title,        # store EXACT mapping value
+                pok_url,
+                base_total,
+                secret_total,
+                released_md,
+                released_year,
+                released_raw,
+            ))
+
+        # Stage everything in a temp table, then apply it with ONE set-based UPDATE
+        cur.execute("""
+            CREATE TEMP TABLE tmp_meta (
+                pc_slug TEXT PRIMARY KEY,
+                pok_title TEXT,
+                pok_url TEXT,
+                base_total INTEGER,
+                secret_total INTEGER,
+                released_md TEXT,
+                released_year INTEGER,
+                released_raw TEXT
             )
-            updated += 1
+        """)
+        cur.executemany("INSERT INTO tmp_meta VALUES (?, ?, ?, ?, ?, ?, ?, ?)", meta_rows)
+
+        cur.execute(
+            f"""
+            UPDATE {TABLE}
+            SET
+                pokellector_set_name = t.pok_title,
+                pokellector_url = COALESCE(t.pok_url, {TABLE}.pokellector_url),
+                base_total = COALESCE(t.base_total, {TABLE}.base_total),
+                secret_total = COALESCE(t.secret_total, {TABLE}.secret_total),
+                released_md = COALESCE(t.released_md, {TABLE}.released_md),
+                released_year = COALESCE(t.released_year, {TABLE}.released_year),
+                released_raw = COALESCE(t.released_raw, {TABLE}.released_raw),
+                language = 'English'
+            FROM tmp_meta t
+            WHERE t.pc_slug = {TABLE}.set_slug
+            """
+        )
+        updated = cur.rowcount
 
         con.commit()
 
@@ -1,23 +1,21 @@
 # backfill_set_slug.py
 import sqlite3
-from urllib.parse import urlparse
 
 DB="pricecharting.db"
 
 def slug_from_set_url(set_url: str) -> str:
-    path = urlparse(set_url or "").path
-    parts = [p for p in path.split("/") if p]
-    return parts[-1] if parts else ""
+    # last path segment of a trusted pricecharting URL; plain string scans, no urlparse
+    if not set_url:
+        return ""
+    return set_url.partition("?")[0].partition("#")[0].rstrip("/").rpartition("/")[2]
 
 con = sqlite3.connect(DB)
+con.create_function("slug_from_url", 1, slug_from_set_url, deterministic=True)
 cur = con.cursor()
 
-cur.execute("SELECT card_url, set_url FROM cards WHERE set_slug IS NULL OR set_slug=''")
-rows = cur.fetchall()
-
-for card_url, set_url in rows:
-    slug = slug_from_set_url(set_url)
-    cur.execute("UPDATE cards SET set_slug=? WHERE card_url=?", (slug, card_url))
+# One set-based UPDATE (single statement, single transaction) instead of one per row
+cur.execute("UPDATE cards SET set_slug = slug_from_url(set_url) WHERE set_slug IS NULL OR set_slug=''")
+print(f"Updated {cur.rowcount} rows")
 
 # default language if you want
 #cur.execute("UPDATE cards SET language=COALESCE(NULLIF(language,''), 'English')")
@@ -35,10 +35,12 @@ NOTE: OFF-BY-ONE JOIN FIX
 
 import argparse
 import csv
-import json
+import itertools
 import os
-import re
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import orjson
 
 DEFAULT_MANIFEST = "tmp/upload_manifest.jsonl"
 DEFAULT_IDENTS = "tmp/card_identifications.jsonl"
@@ -128,6 +130,16 @@ COLUMNS = [
     "BestOfferAutoAcceptPrice",
 ]
 
+# column name -> position; rows are filled by index into a copy of EMPTY_ROW
+COL_IDX = {name: i for i, name in enumerate(COLUMNS)}
+EMPTY_ROW = [""] * len(COLUMNS)
+
+_NO_IDENT: Dict[str, Any] = {}  # shared read-only default for rows without an ident record
+
+OUT_BUFFER_BYTES = 1 << 20
+
+
+@lru_cache(maxsize=4096)  # most cards in a batch share a handful of sets
 def normalize_slug(best_slug:str) -> str:
     split_slug = best_slug.split('-')
     split_slug = split_slug[1:] # remove pokemon
@@ -135,17 +147,38 @@ def normalize_slug(best_slug:str) -> str:
     final = ' '.join(split_slug)
     return final
 
-def read_jsonl(path: str) -> List[Dict[str, Any]]:
-    out: List[Dict[str, Any]] = []
-    with open(path, "r", encoding="utf-8") as f:
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield one parsed record per non-blank line; nothing is materialized."""
+    with open(path, "rb") as f:
         for line in f:
-            line = line.strip()
-            if not line:
+            if line.isspace():
                 continue
-            out.append(json.loads(line))
+            yield orjson.loads(line)  # bytes in, surrounding whitespace tolerated
+
+
+def index_by_listing(path: str) -> Dict[int, Dict[str, Any]]:
+    """
+    listing_index -> record for a JSONL file. The join from match_review must be
+    many-to-one, so duplicate listing_index values are reported (last one wins).
+    """
+    out: Dict[int, Dict[str, Any]] = {}
+    dupes: List[int] = []
+    for rec in iter_jsonl(path):
+        if "listing_index" not in rec:
+            continue
+        k = int(rec["listing_index"])
+        if k in out:
+            dupes.append(k)
+        out[k] = rec
+    if dupes:
+        print(f"WARNING: {path}: {len(dupes)} duplicate listing_index values (e.g. {dupes[:5]}); last record wins")
     return out
 
 
+_TRUTHY = frozenset(("1", "true", "t", "yes", "y"))
+_FALSY = frozenset(("0", "false", "f", "no", "n", ""))
+
+
 def parse_boolish(v: Any) -> bool:
     """Return True if it means 'needs review'."""
     if v is None:
@@ -153,13 +186,19 @@ def parse_boolish(v: Any) -> bool:
     if isinstance(v, bool):
         return v
     s = str(v).strip().lower()
-    if s in ("1", "true", "t", "yes", "y"):
+    if s in _TRUTHY:
         return True
-    if s in ("0", "false", "f", "no", "n", ""):
+    if s in _FALSY:
         return False
     return True  # unknown -> conservative
 
 
+# Deletes every ASCII char except digits and "." in one C-level pass.
+_NON_NUMERIC = str.maketrans("", "", "".join(
+    chr(c) for c in range(128) if not (chr(c).isdigit() or chr(c) == ".")
+))
+
+
 def parse_float(val: Any) -> Optional[float]:
     if val is None:
         return None
@@ -168,8 +207,13 @@ def parse_float(val: Any) -> Optional[float]:
     s = str(val).strip()
     if not s:
         return None
+    if s.isascii() and s.replace(".", "", 1).isdigit():
+        return float(s)  # already plain "12" / "12.50": nothing to filter
     s = s.replace("$", "").replace(",", "")
-    s = re.sub(r"[^\d.]+", "", s)
+    s = s.translate(_NON_NUMERIC)
+    if not s.isascii():
+        # rare non-ASCII leftovers (e.g. NBSP, currency signs): same filter, slow path
+        s = "".join(ch for ch in s if ch.isdigit() or ch == ".")
     if not s:
         return None
     try:
@@ -181,8 +225,15 @@ def parse_float(val: Any) -> Optional[float]:
 def parse_int(val: Any) -> Optional[int]:
     if val is None or val == "":
         return None
+    if type(val) is int:
+        return val
+    s = str(val).strip()
+    try:
+        return int(s)  # common case: plain integer text, no float round-trip
+    except ValueError:
+        pass
     try:
-        return int(float(str(val).strip()))
+        return int(float(s))
     except Exception:
         return None
 
@@ -212,6 +263,17 @@ def pretty_cents_49_or_95(x: float) -> float:
     return round(dollars + 0.95, 2)
 
 
+@lru_cache(maxsize=4096)
+def final_price(best_ungraded_price: float) -> float:
+    """
+    compute_raw_price + pretty_cents_49_or_95 in one call. PriceCharting
+    ungraded prices repeat heavily across a batch, so each distinct price is
+    computed once.
+    """
+    return pretty_cents_49_or_95(compute_raw_price(best_ungraded_price))
+
+
+@lru_cache(maxsize=4096)
 def build_title(best_name: str, best_set_slug: str, input_collector: str, condition="NM") -> str:
     parts = [best_name.strip(), input_collector, normalize_slug(best_set_slug).strip(), condition]
     final = " ".join([p for p in parts if p])
@@ -225,6 +287,146 @@ def build_description(best_name: str, best_set_slug: str, best_number: str) -> s
     return f"{best_name} from {best_set_slug}, card number {best_number} in NM condition."
 
 
+def build_template(args: argparse.Namespace) -> List[str]:
+    """
+    EMPTY_ROW with every per-batch constant (eBay defaults from args, fixed
+    listing fields) already filled in; approved rows copy it and only set
+    their card-specific cells.
+    """
+    template = EMPTY_ROW.copy()
+    template[0] = "Add"
+    template[COL_IDX["CustomLabel"]] = args.customlabel  # same for all rows
+    template[COL_IDX["*Category"]] = args.category
+    template[COL_IDX["StoreCategory"]] = args.store_category
+    template[COL_IDX["*ConditionID"]] = args.condition_id
+    template[COL_IDX["*C:Game"]] = "Pokémon TCG"
+    template[COL_IDX["CD:Card Condition - (ID: 40001)"]] = args.card_condition
+    template[COL_IDX["*Format"]] = "FixedPrice"
+    template[COL_IDX["*Duration"]] = "GTC"
+    template[COL_IDX["BuyItNowPrice"]] = "0"
+    template[COL_IDX["*Quantity"]] = "1"
+    template[COL_IDX["*Location"]] = args.location
+    template[COL_IDX["PostalCode"]] = args.postal_code
+    template[COL_IDX["*DispatchTimeMax"]] = args.dispatch_time
+    template[COL_IDX["ShippingProfileName"]] = args.shipping_profile
+    template[COL_IDX["ReturnProfileName"]] = args.return_profile
+    template[COL_IDX["PaymentProfileName"]] = args.payment_profile
+    template[COL_IDX["BestOfferEnabled"]] = args.best_offer_enabled
+    template[COL_IDX["MinimumBestOfferPrice"]] = args.min_best_offer
+    template[COL_IDX["BestOfferAutoAcceptPrice"]] = args.auto_accept_best_offer
+    return template
+
+
+def iter_approved(
+    review_rows: Iterable[List[str]],
+    header: List[str],
+    man_by_idx: Dict[int, Dict[str, Any]],
+    ident_by_idx: Dict[int, Dict[str, Any]],
+    args: argparse.Namespace,
+    skipped: List[str],
+) -> Iterator[List[str]]:
+    """
+    Yields one eBay CSV row (list of cells, COLUMNS order) per approved review row.
+    Skip reasons are appended to `skipped`; row payloads are never accumulated.
+
+    review_rows are plain csv.reader lists; `header` is their first line.
+    """
+    template = build_template(args)
+    max_ungraded = args.max_ungraded
+    max_final = args.max_final
+
+    # bind column positions once; absent columns read a trailing "" pad cell
+    width = len(header) + 1
+    col = {name: i for i, name in enumerate(header)}
+    i_idx = col.get("idx", width - 1)
+    i_needs_review = col.get("needs_review", width - 1)
+    i_best_name = col.get("best_name", width - 1)
+    i_best_number = col.get("best_number", width - 1)
+    i_best_set_slug = col.get("best_set_slug", width - 1)
+    i_input_collector = col.get("input_collector", width - 1)
+    i_ungraded = col.get("best_ungraded_price", width - 1)
+    i_copyright_year = col.get("copyright_year", width - 1)
+
+    for r in review_rows:
+        # cells past the header are dropped so the pad cell is always ""
+        # (DictReader.get semantics), then short rows are padded
+        if len(r) >= width:
+            del r[width - 1:]
+        r.extend([""] * (width - len(r)))
+
+        idx0 = parse_int(r[i_idx])
+        if idx0 is None:
+            continue
+
+        manifest_idx = idx0 + 1  # <-- OFF-BY-ONE FIX
+
+        # filters run cheapest-first; the manifest join only sees survivors
+        if parse_boolish(r[i_needs_review]):
+            skipped.append(f"[idx0={idx0} -> listing_index={manifest_idx}] needs_review=true")
+            continue
+
+        ungraded = parse_float(r[i_ungraded])
+        if ungraded is None:
+            skipped.append(f"[idx0={idx0}] missing/invalid best_ungraded_price")
+            continue
+        if ungraded >= max_ungraded:
+            skipped.append(f"[idx0={idx0}] ungraded {ungraded:.2f} >= {max_ungraded:.2f}")
+            continue
+
+        price = final_price(ungraded)
+        if price >= max_final:
+            skipped.append(f"[idx0={idx0}] final {price:.2f} >= {max_final:.2f}")
+            continue
+
+        # build the ebay title
+        best_name = r[i_best_name].strip()
+        best_number = r[i_best_number].strip()
+        best_set_slug = r[i_best_set_slug].strip()
+        input_collector = r[i_input_collector].strip()
+
+        if not best_name or not best_number or not best_set_slug:
+            skipped.append(f"[idx0={idx0} -> listing_index={manifest_idx}] missing best fields")
+            continue
+
+        man = man_by_idx.get(manifest_idx)
+        if not man:
+            skipped.append(f"[idx0={idx0} -> listing_index={manifest_idx}] missing manifest row")
+            continue
+
+        front_url = (man.get("front_url") or "").strip()
+        back_url = (man.get("back_url") or "").strip()
+        if not front_url or not back_url:
+            skipped.append(f"[idx0={idx0} -> listing_index={manifest_idx}] missing front_url/back_url")
+            continue
+
+        # Fallback fields from ident file (also 1-based listing_index)
+        ident = ident_by_idx.get(manifest_idx, _NO_IDENT)
+        language = (ident.get("language") or "").strip()
+        year_manufactured = parse_int(r[i_copyright_year])
+        if year_manufactured is None:
+            year_manufactured = parse_int(ident.get("copyright_year"))
+
+        title = build_title(best_name, best_set_slug, input_collector)
+        desc = build_description(best_name, best_set_slug, best_number)
+
+        # EXACT delimiter to match your successful file
+        picurl = f"{front_url} | {back_url}"
+
+        row = template.copy()
+        row[COL_IDX["*Title"]] = title
+        row[COL_IDX["*C:Card Name"]] = best_name
+        row[COL_IDX["*C:Character"]] = best_name
+        row[COL_IDX["*C:Set"]] = best_set_slug
+        row[COL_IDX["*C:Card Number"]] = best_number
+        row[COL_IDX["C:Year Manufactured"]] = "" if year_manufactured is None else str(year_manufactured)
+        row[COL_IDX["C:Language"]] = language
+        row[COL_IDX["PicURL"]] = picurl
+        row[COL_IDX["*Description"]] = desc
+        row[COL_IDX["*StartPrice"]] = f"{price:.2f}"
+
+        yield row
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--manifest", default=DEFAULT_MANIFEST)
@@ -258,140 +460,42 @@ def main():
 
     args = ap.parse_args()
 
-    manifest_rows = read_jsonl(args.manifest)
-    ident_rows = read_jsonl(args.idents)
-
-    # manifest/idents are 1-based listing_index
-    man_by_idx: Dict[int, Dict[str, Any]] = {
-        int(m["listing_index"]): m for m in manifest_rows if "listing_index" in m
-    }
-    ident_by_idx: Dict[int, Dict[str, Any]] = {
-        int(r["listing_index"]): r for r in ident_rows if "listing_index" in r
-    }
+    # manifest/idents are 1-based listing_index (built straight from the stream)
+    man_by_idx = index_by_listing(args.manifest)
+    ident_by_idx = index_by_listing(args.idents)
 
-    # match_review idx is 0-based
-    review_rows: List[Dict[str, Any]] = []
-    with open(args.match_review, "r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            review_rows.append(row)
-
-    approved_rows: List[List[str]] = []
     skipped: List[str] = []
 
-    for r in review_rows:
-        idx0 = parse_int(r.get("idx"))
-        if idx0 is None:
-            continue
-
-        manifest_idx = idx0 + 1  # <-- OFF-BY-ONE FIX
-
-        if parse_boolish(r.get("needs_review")):
-            skipped.append(f"[idx0={idx0} -> listing_index={manifest_idx}] needs_review=true")
-            #continue
-
-        man = man_by_idx.get(manifest_idx)
-        if not man:
-            skipped.append(f"[idx0={idx0} -> listing_index={manifest_idx}] missing manifest row")
-            continue
-
-        front_url = (man.get("front_url") or "").strip()
-        back_url = (man.get("back_url") or "").strip()
-        if not front_url or not back_url:
-            skipped.append(f"[idx0={idx0} -> listing_index={manifest_idx}] missing front_url/back_url")
-            continue
-
-        # build the ebay title
-        best_name = (r.get("best_name") or "").strip()
-        best_number = (r.get("best_number") or "").strip()
-        best_set_slug = (r.get("best_set_slug") or "").strip()
-        input_collector = (r.get("input_collector") or "").strip()
-
-        if not best_name or not best_number or not best_set_slug:
-            skipped.append(f"[idx0={idx0} -> listing_index={manifest_idx}] missing best fields")
-            continue
-
-        ungraded = parse_float(r.get("best_ungraded_price"))
-        if ungraded is None:
-            skipped.append(f"[idx0={idx0}] missing/invalid best_ungraded_price")
-            continue
-        if ungraded >= args.max_ungraded:
-            skipped.append(f"[idx0={idx0}] ungraded {ungraded:.2f} >= {args.max_ungraded:.2f}")
-            continue
-
-        raw_price = compute_raw_price(ungraded)
-        final_price = pretty_cents_49_or_95(raw_price)
-        if final_price >= args.max_final:
-            skipped.append(f"[idx0={idx0}] final {final_price:.2f} >= {args.max_final:.2f}")
-            continue
-
-        # Fallback fields from ident file (also 1-based listing_index)
-        language = (ident_by_idx.get(manifest_idx, {}).get("language") or "").strip()
-        year_manufactured = parse_int(r.get("copyright_year"))
-        if year_manufactured is None:
-            year_manufactured = parse_int(ident_by_idx.get(manifest_idx, {}).get("copyright_year"))
-
-        title = build_title(best_name, best_set_slug, input_collector)
-        desc = build_description(best_name, best_set_slug, best_number)
-
-        # EXACT delimiter to match your successful file
-        picurl = f"{front_url} | {back_url}"
-
-        row = {c: "" for c in COLUMNS}
-        row.update({
-            COLUMNS[0]: "Add",
-            "CustomLabel": args.customlabel,  # same for all rows
-            "*Category": args.category,
-            "StoreCategory": args.store_category,
-            "*Title": title,
-            "*ConditionID": args.condition_id,
-            "*C:Game": "Pokémon TCG",
-            "*C:Card Name": best_name,
-            "*C:Character": best_name,
-            "*C:Set": best_set_slug,
-            "CD:Card Condition - (ID: 40001)": args.card_condition,
-            "*C:Card Number": best_number,
-            "C:Year Manufactured": "" if year_manufactured is None else str(year_manufactured),
-            "C:Language": language,
-            "PicURL": picurl,
-            "GalleryType": "",
-            "*Description": desc,
-            "*Format": "FixedPrice",
-            "*Duration": "GTC",
-            "*StartPrice": f"{final_price:.2f}",
-            "BuyItNowPrice": "0",
-            "*Quantity": "1",
-            "*Location": args.location,
-            "PostalCode": args.postal_code,
-            "*DispatchTimeMax": args.dispatch_time,
-            "ShippingProfileName": args.shipping_profile,
-            "ReturnProfileName": args.return_profile,
-            "PaymentProfileName": args.payment_profile,
-            "BestOfferEnabled": args.best_offer_enabled,
-            "MinimumBestOfferPrice": args.min_best_offer,
-            "BestOfferAutoAcceptPrice": args.auto_accept_best_offer,
-        })
-
-        approved_rows.append([row.get(c, "") for c in COLUMNS])
-
-    if not approved_rows:
-        print("No rows qualified. Nothing written.")
-        print("Some skip reasons:")
-        for s in skipped[:30]:
-            print(" ", s)
-        return
-
-    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
-
-    # Match your successful file: first line unquoted; header/rows quoted
-    with open(args.out, "w", encoding="utf-8", newline="") as f:
-        f.write(INFO_LINE + "\n")
-        w = csv.writer(f, quoting=csv.QUOTE_ALL)
-        w.writerow(COLUMNS)
-        w.writerows(approved_rows)
+    # match_review idx is 0-based; rows stream from the reader through
+    # iter_approved straight into the output writer
+    with open(args.match_review, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        approved_iter = iter_approved(reader, header, man_by_idx, ident_by_idx, args, skipped)
+
+        first = next(approved_iter, None)
+        if first is None:
+            print("No rows qualified. Nothing written.")
+            print("Some skip reasons:")
+            for s in skipped[:30]:
+                print(" ", s)
+            return
+
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+
+        # Match your successful file: first line unquoted; header/rows quoted
+        rows = itertools.chain([first], approved_iter)
+        counter = itertools.count()  # zip pulls a row before a count, so this ends at len(rows)
+        with open(args.out, "w", encoding="utf-8", newline="", buffering=OUT_BUFFER_BYTES) as out:
+            out.write(INFO_LINE + "\n")
+            w = csv.writer(out, quoting=csv.QUOTE_ALL)
+            w.writerow(COLUMNS)
+            # writerows streams the generator; the 1 MiB buffer batches the writes
+            w.writerows(row for row, _ in zip(rows, counter))
+        approved = next(counter)
 
     print(f"Wrote: {args.out}")
-    print(f"Approved: {len(approved_rows)}")
+    print(f"Approved: {approved}")
     print(f"Skipped: {len(skipped)}")
     if skipped:
         print("Top skip reasons:")
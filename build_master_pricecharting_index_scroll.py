@@ -1,4 +1,5 @@
 import csv
+import logging
 import os
 import time
 import sqlite3
@@ -10,6 +11,8 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import WebDriverException
 
+log = logging.getLogger(__name__)
+
 # -----------------------
 # SQLite
 # -----------------------
@@ -50,6 +53,15 @@ def upsert_cards(con, rows):
         ungraded_price=excluded.ungraded_price,
         grade9_price=excluded.grade9_price,
         psa10_price=excluded.psa10_price
+    -- skip the row write entirely when nothing changed (re-runs stay out of the WAL)
+    WHERE cards.ungraded_price IS NOT excluded.ungraded_price
+       OR cards.grade9_price IS NOT excluded.grade9_price
+       OR cards.psa10_price IS NOT excluded.psa10_price
+       OR cards.image_url IS NOT excluded.image_url
+       OR cards.card_name IS NOT excluded.card_name
+       OR cards.card_number IS NOT excluded.card_number
+       OR cards.product_id IS NOT excluded.product_id
+       OR cards.set_url IS NOT excluded.set_url
     """, rows)
     con.commit()
 
@@ -82,7 +94,7 @@ def fetch_full_set_html_by_scrolling(driver, set_url: str, max_scrolls: int = 25
     """
     Loads set_url and scrolls until row count stops increasing.
     """
-    print("get_url")
+    log.debug("get %s", set_url)
     driver.get(set_url)
     time.sleep(2.0)
 
@@ -92,7 +104,7 @@ def fetch_full_set_html_by_scrolling(driver, set_url: str, max_scrolls: int = 25
     for _ in range(max_scrolls):
         rows = driver.find_elements(By.CSS_SELECTOR, "table#games_table tbody tr[data-product]")
         count = len(rows)
-        print(count)
+        log.debug("rows=%d", count)
 
         if count == last_count:
             stable += 1
@@ -104,9 +116,8 @@ def fetch_full_set_html_by_scrolling(driver, set_url: str, max_scrolls: int = 25
             break
 
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        print("scrolling ...")
+        log.debug("scrolling ...")
         time.sleep(5.0)
-        print("waiting ...")
 
     return driver.page_source
 
@@ -120,15 +131,15 @@ def scrape_set_with_retry(
 ):
     last_err = None
     for attempt in range(1, max_attempts + 1):
-        print("creating the chromedriver")
+        log.debug("creating the chromedriver")
         driver = make_chrome_driver(chromedriver_path, headless=headless, chrome_binary=chrome_binary)
         try:
             # timeouts (important)
-            print("loading page...")
+            log.debug("loading page ...")
             driver.set_page_load_timeout(120)
             driver.set_script_timeout(120)
             html = fetch_full_set_html_by_scrolling(driver, set_url, max_scrolls=20, settle_rounds=1)
-            print(html)
+            log.debug("html len=%d", len(html))
             return html
         except Exception as e:
             last_err = e
@@ -151,13 +162,19 @@ def scrape_set_with_retry(
 # Parse HTML -> rows
 # -----------------------
 
+# One C-level pass deletes "$", "," and whitespace
+_PRICE_TRANS = str.maketrans("", "", "$, \t\n\r")
+
 def _parse_price(text: str):
     if not text:
         return None
-    txt = text.replace("$", "").replace(",", "").strip()
+    txt = text.translate(_PRICE_TRANS)
+    # placeholders like "-" / "N/A" are rejected without raising
+    if not txt or txt[0] not in "0123456789.":
+        return None
     try:
         return float(txt)
-    except:
+    except ValueError:
         return None
 
 def parse_cards_from_html(set_url: str, html: str):
@@ -168,12 +185,13 @@ def parse_cards_from_html(set_url: str, html: str):
 
     out = []
     for tr in table.select("tbody tr[data-product]"):
-        product_id = (tr.get("data-product") or "").strip()
-
+        # required cell first: skip the row before any other selector runs
         a = tr.select_one("td.title a[href]")
         if not a:
             continue
 
+        product_id = (tr.get("data-product") or "").strip()
+
         card_text = a.get_text(" ", strip=True)  # "Gardevoir ex #245"
         href = (a.get("href") or "").strip()
         card_url = href if href.startswith("http") else f"https://www.pricecharting.com{href}"
@@ -181,12 +199,13 @@ def parse_cards_from_html(set_url: str, html: str):
         img = tr.select_one("td.image img")
         image_url = (img.get("src") or "").strip() if img else ""
 
-        ungraded = _parse_price(tr.select_one("td.used_price span.js-price").get_text(strip=True)
-                               if tr.select_one("td.used_price span.js-price") else "")
-        grade9 = _parse_price(tr.select_one("td.cib_price span.js-price").get_text(strip=True)
-                             if tr.select_one("td.cib_price span.js-price") else "")
-        psa10 = _parse_price(tr.select_one("td.new_price span.js-price").get_text(strip=True)
-                            if tr.select_one("td.new_price span.js-price") else "")
+        # each price selector runs once; the match is bound to a local
+        u = tr.select_one("td.used_price span.js-price")
+        ungraded = _parse_price(u.get_text(strip=True)) if u else None
+        g9 = tr.select_one("td.cib_price span.js-price")
+        grade9 = _parse_price(g9.get_text(strip=True)) if g9 else None
+        p10 = tr.select_one("td.new_price span.js-price")
+        psa10 = _parse_price(p10.get_text(strip=True)) if p10 else None
 
         card_name, card_number = card_text, ""
         if " #" in card_text:
@@ -257,6 +276,9 @@ def build_db_from_sets_csv(
 
 
 if __name__ == "__main__":
+    # INFO by default; switch to DEBUG to trace scrolling/driver lifecycle
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # EDIT THESE PATHS:
     CHROMEDRIVER_PATH =  "chromedriver-linux64/chromedriver"  # <-- change to your actual path
 
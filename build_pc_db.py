@@ -1,12 +1,20 @@
+import asyncio
 import csv
-import time
 import re
 import sqlite3
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin
 
+from rate_limiter import RateLimiter
+
 HEADERS = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"}
+MAX_WORKERS = 8
+ASYNC_CONCURRENCY = 16
+ASYNC_CHUNK = 200  # set URLs gathered per round, bounds in-flight pages/results
+REQUESTS_PER_SEC = 2.0  # global politeness cap shared by all workers (was a 1s sleep per set)
 PRICE_RE = re.compile(r"\$?\s*([0-9]+(?:\.[0-9]{1,2})?)")
 
 def parse_price(text):
@@ -15,9 +23,16 @@ def parse_price(text):
     m = PRICE_RE.search(text)
     return float(m.group(1)) if m else None
 
+COMMIT_EVERY_SETS = 25
+
 def init_db(db_path="pricecharting.db"):
     con = sqlite3.connect(db_path)
     cur = con.cursor()
+    # WAL + relaxed sync: commits no longer fsync the main DB file each time
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA cache_size=-64000")
     cur.execute("""
     CREATE TABLE IF NOT EXISTS cards (
         card_url TEXT PRIMARY KEY,
@@ -32,14 +47,38 @@ def init_db(db_path="pricecharting.db"):
     )
     """)
     cur.execute("CREATE INDEX IF NOT EXISTS idx_cards_number ON cards(card_number)")
+    # composite keys for the (set, number) / (name, number) lookups downstream
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_cards_set_num ON cards(set_url, card_number)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_cards_name_num ON cards(card_name COLLATE NOCASE, card_number)")
     con.commit()
     return con
 
-def scrape_set_cards(set_url):
-    r = requests.get(set_url, headers=HEADERS, timeout=30)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+def make_session() -> requests.Session:
+    s = requests.Session()
+    s.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
 
+def scrape_set_cards(set_url, session=None):
+    r = (session or requests).get(set_url, headers=HEADERS, timeout=30)
+    r.raise_for_status()
+    return parse_set_cards(set_url, r.content)
+
+def parse_set_cards(set_url, content):
+    """
+    content: raw page bytes (lxml detects the encoding in C).
+    Only table#games_table is built into a tree; the rest of the page is
+    skipped at tokenize time.
+    """
+    soup = BeautifulSoup(content, "lxml", parse_only=SoupStrainer("table", id="games_table"))
+    try:
+        return _rows_from_soup(set_url, soup)
+    finally:
+        soup.decompose()  # free the tree now rather than at GC time
+
+def _rows_from_soup(set_url, soup):
     table = soup.select_one("table#games_table")
     if not table:
         return []
@@ -93,28 +132,103 @@ def upsert_cards(con, rows):
         ungraded_price=excluded.ungraded_price,
         grade9_price=excluded.grade9_price,
         psa10_price=excluded.psa10_price
+    -- skip the row write entirely when nothing changed (re-runs stay out of the WAL)
+    WHERE cards.ungraded_price IS NOT excluded.ungraded_price
+       OR cards.grade9_price IS NOT excluded.grade9_price
+       OR cards.psa10_price IS NOT excluded.psa10_price
+       OR cards.image_url IS NOT excluded.image_url
+       OR cards.card_name IS NOT excluded.card_name
+       OR cards.card_number IS NOT excluded.card_number
+       OR cards.product_id IS NOT excluded.product_id
+       OR cards.set_url IS NOT excluded.set_url
     """, rows)
+
+async def fetch_and_parse(session, set_url, sem, limiter):
+    async with sem:
+        await limiter.acquire_async()
+        async with session.get(set_url) as r:
+            r.raise_for_status()
+            content = await r.read()
+    # parsing is CPU-bound; keep it off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, parse_set_cards, set_url, content)
+
+async def _scrape_sets_async(con, set_urls):
+    import aiohttp
+
+    sem = asyncio.Semaphore(ASYNC_CONCURRENCY)
+    limiter = RateLimiter(REQUESTS_PER_SEC)
+    timeout = aiohttp.ClientTimeout(total=30)
+    done = 0
+
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout) as session:
+        for start in range(0, len(set_urls), ASYNC_CHUNK):
+            chunk = set_urls[start:start + ASYNC_CHUNK]
+            results = await asyncio.gather(
+                *(fetch_and_parse(session, u, sem, limiter) for u in chunk),
+                return_exceptions=True,
+            )
+            # the event loop thread is the single SQLite writer
+            for set_url, cards in zip(chunk, results):
+                done += 1
+                print(f"[{done}/{len(set_urls)}] {set_url}")
+                if isinstance(cards, Exception):
+                    print(f"  ERROR: {cards}")
+                    continue
+                upsert_cards(con, cards)
+                print(f"  +{len(cards)} cards")
+
+                if done % COMMIT_EVERY_SETS == 0:
+                    con.commit()
+
+def finish_db(con):
     con.commit()
+    con.execute("ANALYZE")  # refresh planner stats after the bulk load
+    con.commit()
+    con.close()
 
-def build_db_from_sets(sets_csv="pricecharting_sets.csv", db_path="pricecharting.db"):
+def build_db_from_sets(sets_csv="pricecharting_sets.csv", db_path="pricecharting.db", backend="threads"):
+    """
+    backend: "threads" (requests + thread pool) or "aiohttp" (asyncio, chunked gather).
+    """
     con = init_db(db_path)
 
     with open(sets_csv, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for i, row in enumerate(reader, start=1):
-            set_url = row["set_url"]
-            print(f"[{i}] {set_url}")
+        set_urls = [row["set_url"] for row in csv.DictReader(f)]
+
+    if backend == "aiohttp":
+        try:
+            asyncio.run(_scrape_sets_async(con, set_urls))
+        finally:
+            finish_db(con)
+        print("Done.")
+        return
+
+    session = make_session()
+    limiter = RateLimiter(REQUESTS_PER_SEC)
+
+    def fetch(set_url):
+        limiter.acquire()
+        return scrape_set_cards(set_url, session=session)
+
+    # Workers only fetch + parse; this thread is the single SQLite writer.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = {ex.submit(fetch, u): u for u in set_urls}
+        for i, fut in enumerate(as_completed(futures), start=1):
+            set_url = futures[fut]
+            print(f"[{i}/{len(set_urls)}] {set_url}")
 
             try:
-                cards = scrape_set_cards(set_url)
+                cards = fut.result()
                 upsert_cards(con, cards)
                 print(f"  +{len(cards)} cards")
             except Exception as e:
                 print(f"  ERROR: {e}")
 
-            time.sleep(1)  # be polite
+            if i % COMMIT_EVERY_SETS == 0:
+                con.commit()
 
-    con.close()
+    finish_db(con)
     print("Done.")
 
 if __name__ == "__main__":
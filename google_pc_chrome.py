@@ -1,54 +1,119 @@
+import os
 import sys
 import re
 import requests
+import lxml.html
 from bs4 import BeautifulSoup
-
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qs, urlparse
+from urllib3.util.retry import Retry
 
 
 PRICE_RE = re.compile(r"\$?\s*([0-9]+(?:\.[0-9]{1,2})?)")
 
+# Google Custom Search JSON API credentials; without them we fall back to
+# parsing the plain google.com/search results page.
+GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
+GOOGLE_CSE_ID = os.environ.get("GOOGLE_CSE_ID", "")
 
-def google_first_pricecharting_url(query, chromedriver_path):
-    opts = Options()
-    #opts.add_argument("--headless=new")
-
-    service = Service(chromedriver_path)
-    driver = webdriver.Chrome(service=service, options=opts)
+def make_session():
+    """Keep-alive pool for search + price fetches, with retry/backoff on 429/5xx."""
+    s = requests.Session()
+    s.headers.update({
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    s.mount("https://", HTTPAdapter(
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+    ))
+    return s
 
-    try:
-        driver.get("https://www.google.com")
 
-        box = WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.NAME, "q"))
-        )
+# shared default for the module-level helpers; never closed here
+SESSION = make_session()
 
-        box.send_keys(f"site:pricecharting.com/game {query}")
-        box.send_keys(Keys.ENTER)
 
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.ID, "search"))
-        )
+def _is_pc_game_url(href):
+    return bool(href) and "pricecharting.com/game/" in href
 
-        for a in driver.find_elements(By.CSS_SELECTOR, "a"):
-            href = a.get_attribute("href")
-            if href and "pricecharting.com/game/" in href:
-                return href
 
+def _search_api(query, session):
+    r = session.get(
+        "https://www.googleapis.com/customsearch/v1",
+        params={"key": GOOGLE_API_KEY, "cx": GOOGLE_CSE_ID,
+                "q": f"site:pricecharting.com/game {query}", "num": 1},
+        timeout=20,
+    )
+    r.raise_for_status()
+    for item in r.json().get("items", []):
+        if _is_pc_game_url(item.get("link")):
+            return item["link"]
+    return None
+
+
+def _search_html(query, session):
+    r = session.get(
+        "https://www.google.com/search",
+        params={"q": f"site:pricecharting.com/game {query}", "hl": "en"},
+        timeout=20,
+    )
+    r.raise_for_status()
+    for href in lxml.html.fromstring(r.content).xpath("//a/@href"):
+        # result links are often wrapped as /url?q=<target>&sa=...
+        if href.startswith("/url?"):
+            href = parse_qs(urlparse(href).query).get("q", [""])[0]
+        if _is_pc_game_url(href):
+            return href
+    return None
+
+
+def google_first_pricecharting_url(query, session=SESSION):
+    url = None
+    if GOOGLE_API_KEY and GOOGLE_CSE_ID:
+        url = _search_api(query, session)
+    if not url:
+        url = _search_html(query, session)
+    if not url:
         raise Exception("No PriceCharting link found")
+    return url
+
+
+class PriceChartingSearcher:
+    """
+    Holds a keep-alive session for any number of lookups.
+
+        with PriceChartingSearcher() as pc:
+            for q in queries:
+                url, price = pc.lookup(q)
 
-    finally:
-        driver.quit()
+    Without a session it creates (and on close() shuts) its own; a session
+    passed in belongs to the caller and is left open.
+    """
+    def __init__(self, session=None):
+        self._owns_session = session is None
+        self.session = make_session() if session is None else session
 
+    def __enter__(self):
+        return self
 
-def fetch_ungraded_price(url):
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=20)
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._owns_session:
+            self.session.close()
+
+    def first_url(self, query):
+        return google_first_pricecharting_url(query, session=self.session)
+
+    def lookup(self, query):
+        url = self.first_url(query)
+        return url, fetch_ungraded_price(url, session=self.session)
+
+
+def fetch_ungraded_price(url, session=SESSION):
+    r = session.get(url, timeout=20)
     r.raise_for_status()
 
     soup = BeautifulSoup(r.text, "html.parser")
@@ -61,16 +126,13 @@ def fetch_ungraded_price(url):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python google_pricecharting_chrome.py /path/to/chromedriver \"SEARCH QUERY\"")
+    if len(sys.argv) < 2:
+        print("Usage: python google_pc_chrome.py \"SEARCH QUERY\" [\"SEARCH QUERY\" ...]")
         sys.exit(1)
 
-    chromedriver = sys.argv[1]
-    query = sys.argv[2]
-
-    url = google_first_pricecharting_url(query, chromedriver)
-    price = fetch_ungraded_price(url)
-
-    print("PriceCharting URL:", url)
-    print("Ungraded Price:", price)
+    with PriceChartingSearcher() as pc:
+        for query in sys.argv[1:]:
+            url, price = pc.lookup(query)
 
+            print("PriceCharting URL:", url)
+            print("Ungraded Price:", price)
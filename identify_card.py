@@ -1,17 +1,26 @@
+import asyncio
 import sys
 import os
 import base64
+import mmap
 import time
-import json
-from openai import OpenAI
+import orjson
+from openai import AsyncOpenAI, OpenAI
 
 client = OpenAI()
 
 TMP_OUT = "tmp/card_identifications.jsonl"
+ASYNC_CONCURRENCY = 16  # in-flight Vision requests for directory runs
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
 
 def to_data_url(path: str) -> str:
+    # encode straight from a read-only mmap: pages fault in lazily and the
+    # raw image is never copied into a Python bytes object first
     with open(path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode("utf-8")
+        if os.fstat(f.fileno()).st_size == 0:
+            return "data:image/png;base64,"  # mmap can't map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            b64 = base64.b64encode(mm).decode("ascii")
     return f"data:image/png;base64,{b64}"
 
 schema = {
@@ -47,13 +56,10 @@ schema = {
     "additionalProperties": False
 }
 
-def identify_card(
-    image_path: str,
+def build_prompt(
     min_copyright_year: int | None = None,
     max_copyright_year: int | None = None,
-):
-    img_url = to_data_url(image_path)
-
+) -> str:
     # Build a tight instruction block for the year constraint.
     # The key is "do not guess" + "null if unreadable" + "range gate".
     year_rules = []
@@ -76,7 +82,7 @@ def identify_card(
             "If readable, set year_in_range=true.\n"
         )
 
-    prompt = (
+    return (
         "Identify this Pokémon card from the image.\n"
         "Extract EXACTLY as printed:\n"
         "- collector_number in the format X/Y (e.g., 103/165)\n"
@@ -89,7 +95,8 @@ def identify_card(
         "Set confidence from 0 to 1 (lower if anything is uncertain).\n"
     )
 
-    resp = client.responses.create(
+def request_kwargs(img_url: str, prompt: str) -> dict:
+    return dict(
         model="gpt-4o-mini",
         input=[{
             "role": "user",
@@ -108,19 +115,88 @@ def identify_card(
         }
     )
 
-    return json.loads(resp.output_text)
+def identify_card(
+    image_path: str,
+    min_copyright_year: int | None = None,
+    max_copyright_year: int | None = None,
+):
+    img_url = to_data_url(image_path)
+    prompt = build_prompt(min_copyright_year, max_copyright_year)
+
+    resp = client.responses.create(**request_kwargs(img_url, prompt))
+
+    return orjson.loads(resp.output_text)
+
+async def identify_card_async(
+    image_path: str,
+    aclient: AsyncOpenAI,
+    sem: asyncio.Semaphore,
+    min_copyright_year: int | None = None,
+    max_copyright_year: int | None = None,
+):
+    prompt = build_prompt(min_copyright_year, max_copyright_year)
+    async with sem:
+        # encoding is file I/O + CPU; keep it off the event loop
+        img_url = await asyncio.to_thread(to_data_url, image_path)
+        resp = await aclient.responses.create(**request_kwargs(img_url, prompt))
+
+    return orjson.loads(resp.output_text)
+
+async def _jsonl_writer(queue: asyncio.Queue, out_path: str):
+    # single consumer, so concurrent results never interleave within a line
+    with open(out_path, "wb") as out:
+        while True:
+            data = await queue.get()
+            if data is None:
+                return
+            out.write(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
+
+async def identify_dir(
+    image_dir: str,
+    min_copyright_year: int | None = None,
+    out_path: str = TMP_OUT,
+    concurrency: int = ASYNC_CONCURRENCY,
+):
+    paths = sorted(
+        os.path.join(image_dir, name)
+        for name in os.listdir(image_dir)
+        if name.lower().endswith(IMAGE_EXTS)
+    )
+
+    aclient = AsyncOpenAI()
+    sem = asyncio.Semaphore(concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+    writer = asyncio.create_task(_jsonl_writer(queue, out_path))
+
+    async def one(path):
+        try:
+            data = await identify_card_async(path, aclient, sem, min_copyright_year=min_copyright_year)
+        except Exception as e:
+            print("ERROR:", path, e)
+            return
+        data["image"] = path
+        await queue.put(data)
+        print("something:", path, data)
+
+    try:
+        await asyncio.gather(*(one(p) for p in paths))
+    finally:
+        await queue.put(None)
+        await writer
+        await aclient.close()
 
 if __name__ == "__main__":
     os.makedirs("tmp", exist_ok=True)
 
     # Usage:
     # python script.py /path/to/image.png 2020
+    # python script.py /path/to/image_dir 2020
     #
-    # argv[1] -> image path
+    # argv[1] -> image path, or a directory of images (identified concurrently)
     # argv[2] -> min copyright year (optional)
 
     if len(sys.argv) < 2:
-        print("Usage: python script.py <image_path> [min_copyright_year]")
+        print("Usage: python script.py <image_path|image_dir> [min_copyright_year]")
         sys.exit(1)
 
     img = sys.argv[1]
@@ -133,6 +209,10 @@ if __name__ == "__main__":
             print("min_copyright_year must be an integer")
             sys.exit(1)
 
+    if os.path.isdir(img):
+        asyncio.run(identify_dir(img, min_copyright_year=min_year))
+        sys.exit(0)
+
     data = identify_card(
         img,
         min_copyright_year=min_year
@@ -142,8 +222,8 @@ if __name__ == "__main__":
 
     time.sleep(0.5)  # prevent too many API requests
 
-    with open(TMP_OUT, "w") as out:
-        out.write(json.dumps(data) + "\n")
+    with open(TMP_OUT, "wb") as out:
+        out.write(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
 
     print("something:", img, data)
 
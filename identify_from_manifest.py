@@ -1,27 +1,73 @@
+import asyncio
 import os
 import sys
 import base64
-import json
-from openai import OpenAI
+import hashlib
+import io
+import mmap
+import random
+import openai
+import orjson
+from openai import AsyncOpenAI
+from PIL import Image, ImageOps
 
-client = OpenAI()
+from jsonl_io import iter_raw_lines
+
+from rate_limiter import RateLimiter
+
+# one async client for every request (shares its httpx connection pool);
+# SDK retries off so create_response's MAX_ATTEMPTS + LIMITER are the only
+# retry/throttle path
+client = AsyncOpenAI(max_retries=0)
 
 IN_MANIFEST = "tmp/upload_manifest.jsonl"
 TMP_OUT = "tmp/card_identifications.jsonl"
+CONCURRENCY = 32  # vision requests in flight at once
+IDENT_CACHE = "tmp/identify_cache.json"  # image digest + prompt -> identification, kept across runs
 
-def to_data_url(path: str) -> str:
-    with open(path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode("utf-8")
+MAX_IMAGE_DIM = 1024  # longest side sent to the model
+IMAGE_DETAIL = "low"  # switch to "high" if small print (© year) starts coming back null
 
-    ext = os.path.splitext(path)[1].lower()
-    if ext in [".jpg", ".jpeg"]:
-        mime = "image/jpeg"
-    elif ext == ".webp":
-        mime = "image/webp"
-    else:
-        mime = "image/png"
+REQUESTS_PER_MIN = 500  # keep under the account RPM so bursts don't turn into 429s
+LIMITER = RateLimiter(REQUESTS_PER_MIN / 60)
+
+MAX_ATTEMPTS = 4  # first call + 3 retries
+RETRY_BASE_S = 1.0
+RETRY_MAX_S = 30.0
+RETRY_JITTER_S = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def _is_retriable(e: Exception) -> bool:
+    if isinstance(e, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    if isinstance(e, openai.APIStatusError) and e.status_code in RETRY_STATUSES:
+        return True
+    return "rate limit" in str(e).lower()
+
+async def create_response(**kwargs):
+    """client.responses.create behind LIMITER, with jittered exponential backoff on 429/5xx."""
+    for attempt in range(MAX_ATTEMPTS):
+        await LIMITER.acquire_async()
+        try:
+            return await client.responses.create(**kwargs)
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1 or not _is_retriable(e):
+                raise
+            delay = min(RETRY_MAX_S, RETRY_BASE_S * 2 ** attempt) + random.uniform(0, RETRY_JITTER_S)
+            print(f"  retry {attempt + 1}/{MAX_ATTEMPTS - 1} in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+
+def to_data_url(path: str) -> str:
+    # upright, bounded-size JPEG: fewer vision tokens and a much smaller upload
+    # than the raw full-resolution scan
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((MAX_IMAGE_DIM, MAX_IMAGE_DIM), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.convert("RGB").save(buf, format="JPEG", quality=85, optimize=True)
 
-    return f"data:{mime};base64,{b64}"
+    b64 = base64.b64encode(buf.getbuffer()).decode("ascii")
+    return f"data:image/jpeg;base64,{b64}"
 
 # Updated schema:
 # - copyright_year can be null (instead of forcing wrong integer guesses)
@@ -49,8 +95,9 @@ schema = {
     "additionalProperties": False
 }
 
-def identify_card(image_path: str, min_copyright_year: int | None = None, extra_prompt_information: str = ""):
-    img_url = to_data_url(image_path)
+async def identify_card(image_path: str, min_copyright_year: int | None = None, extra_prompt_information: str = ""):
+    # file read + base64 is blocking; keep it off the event loop
+    img_url = await asyncio.to_thread(to_data_url, image_path)
 
     # Build year constraint instructions (prompt-level)
     if min_copyright_year is not None:
@@ -79,13 +126,13 @@ def identify_card(image_path: str, min_copyright_year: int | None = None, extra_
 
     prompt = prompt + extra_prompt_information
 
-    resp = client.responses.create(
+    resp = await create_response(
         model="gpt-4o-mini",
         input=[{
             "role": "user",
             "content": [
                 {"type": "input_text", "text": prompt},
-                {"type": "input_image", "image_url": img_url},
+                {"type": "input_image", "image_url": img_url, "detail": IMAGE_DETAIL},
             ]
         }],
         text={
@@ -98,7 +145,119 @@ def identify_card(image_path: str, min_copyright_year: int | None = None, extra_
         }
     )
 
-    return json.loads(resp.output_text)
+    return orjson.loads(resp.output_text)
+
+def image_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # 3.11+
+            return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+        h = hashlib.blake2b(digest_size=16)
+        if os.fstat(f.fileno()).st_size:  # mmap can't map an empty file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        return h.hexdigest()
+
+class IdentifyMemo:
+    """
+    Identifies each distinct image once per (min_year, extra prompt). Duplicate
+    images await the same in-flight request; finished results are persisted to
+    IDENT_CACHE so re-runs don't pay for them again.
+    """
+    def __init__(self, sem: asyncio.Semaphore, min_year: int | None, extra_prompt_information: str, path: str = IDENT_CACHE):
+        self.sem = sem
+        self.min_year = min_year
+        self.extra_prompt_information = extra_prompt_information
+        self.path = path
+        self.prompt_key = hashlib.blake2b(
+            f"{min_year}\0{extra_prompt_information}".encode("utf-8"), digest_size=8
+        ).hexdigest()
+        self.inflight: dict[str, asyncio.Future] = {}
+        try:
+            with open(path, "rb") as f:
+                self.cache: dict[str, dict] = orjson.loads(f.read())
+        except FileNotFoundError:
+            self.cache = {}
+
+    async def identify(self, image_path: str) -> dict:
+        digest = await asyncio.to_thread(image_digest, image_path)
+        key = f"{digest}-{self.prompt_key}"
+        if key in self.cache:
+            return self.cache[key]
+
+        fut = self.inflight.get(key)
+        if fut is None:
+            fut = self.inflight[key] = asyncio.ensure_future(self._call(image_path))
+        data = await fut
+        self.cache[key] = data
+        return data
+
+    async def _call(self, image_path: str) -> dict:
+        async with self.sem:
+            return await identify_card(
+                image_path,
+                min_copyright_year=self.min_year,
+                extra_prompt_information=self.extra_prompt_information,
+            )
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(self.cache))
+        os.replace(tmp, self.path)
+
+async def process_record(rec: dict, memo: IdentifyMemo) -> dict:
+    idx = rec.get("listing_index")
+    front_local = rec.get("front_local")
+    min_year = memo.min_year
+
+    if not front_local or not os.path.exists(front_local):
+        print(f"[{idx}] FAIL missing front image:", front_local)
+        return {**rec, "error": f"front_local missing or not found: {front_local}"}
+
+    try:
+        data = await memo.identify(front_local)
+    except Exception as e:
+        print(f"[{idx}] FAIL {front_local} -> {e}")
+        return {**rec, "error": str(e), "image": front_local, "min_copyright_year": min_year}
+
+    cy = data.get("copyright_year")
+    yr_ok = data.get("year_in_range")
+    print(
+        f"[{idx}] OK {data['card_name']} | ©{cy} | year_ok={yr_ok} | "
+        f"set_size={data['set_size']} | #{data['collector_number']} | conf={data['confidence']}"
+    )
+
+    return {
+        **rec,
+        **data,
+        "image": front_local,
+        "min_copyright_year": min_year,  # record what rule was used
+    }
+
+async def identify_manifest(min_year: int | None, extra_prompt_information: str):
+    records = [orjson.loads(line) for line in iter_raw_lines(IN_MANIFEST) if line.strip()]
+
+    memo = IdentifyMemo(asyncio.Semaphore(CONCURRENCY), min_year, extra_prompt_information)
+
+    # results stream out as they finish, reordered to manifest order: each
+    # completion flushes the finished prefix, so an interrupted run keeps it
+    done: dict[int, dict] = {}
+    next_i = 0
+
+    with open(TMP_OUT, "wb") as fout:
+        async def run(i, rec):
+            nonlocal next_i
+            done[i] = await process_record(rec, memo)
+            while next_i in done:
+                fout.write(orjson.dumps(done.pop(next_i), option=orjson.OPT_APPEND_NEWLINE))
+                next_i += 1
+            fout.flush()
+
+        try:
+            await asyncio.gather(*(run(i, rec) for i, rec in enumerate(records)))
+        finally:
+            memo.save()
+            await client.close()
 
 def main():
     os.makedirs("tmp", exist_ok=True)
@@ -120,51 +279,9 @@ def main():
     print(f"Writing output:   {TMP_OUT}")
     print(f"Min year filter:  {min_year if min_year is not None else '(none)'}")
 
-    with open(IN_MANIFEST, "r", encoding="utf-8") as fin, \
-         open(TMP_OUT, "w", encoding="utf-8") as fout:
-
-        for line in fin:
-            line = line.strip()
-            if not line:
-                continue
-
-            rec = json.loads(line)
-
-            idx = rec.get("listing_index")
-            front_local = rec.get("front_local")
-
-            if not front_local or not os.path.exists(front_local):
-                out = {**rec, "error": f"front_local missing or not found: {front_local}"}
-                fout.write(json.dumps(out) + "\n")
-                print(f"[{idx}] FAIL missing front image:", front_local)
-                continue
-
-            try:
-                data = identify_card(front_local, min_copyright_year=min_year, extra_prompt_information=extra_prompt_information)
-
-                out = {
-                    **rec,
-                    **data,
-                    "image": front_local,
-                    "min_copyright_year": min_year,  # record what rule was used
-                }
-
-                fout.write(json.dumps(out) + "\n")
-
-                cy = data.get("copyright_year")
-                yr_ok = data.get("year_in_range")
-                print(
-                    f"[{idx}] OK {data['card_name']} | ©{cy} | year_ok={yr_ok} | "
-                    f"set_size={data['set_size']} | #{data['collector_number']} | conf={data['confidence']}"
-                )
-
-            except Exception as e:
-                out = {**rec, "error": str(e), "image": front_local, "min_copyright_year": min_year}
-                fout.write(json.dumps(out) + "\n")
-                print(f"[{idx}] FAIL {front_local} -> {e}")
+    asyncio.run(identify_manifest(min_year, extra_prompt_information))
 
     print("Wrote:", TMP_OUT)
 
 if __name__ == "__main__":
     main()
-
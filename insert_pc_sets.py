@@ -8,14 +8,16 @@ CSV_PATH = "pricecharting_sets.csv"
 def main():
     con = sqlite3.connect(DB_PATH)
     cur = con.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
 
     with open(CSV_PATH, newline="", encoding="utf-8") as f:
         r = csv.DictReader(f)
-        for row in r:
-            cur.execute("""
-            INSERT OR IGNORE INTO set_meta (set_slug, pc_list_a_name)
-            VALUES (?, ?)
-            """, (row["set_slug"], row["set_name"]))
+        # one prepared statement fed straight from the reader, single commit
+        cur.executemany("""
+        INSERT OR IGNORE INTO set_meta (set_slug, pc_list_a_name)
+        VALUES (?, ?)
+        """, ((row["set_slug"], row["set_name"]) for row in r))
 
     con.commit()
     con.close()
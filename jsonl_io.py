@@ -0,0 +1,24 @@
+# jsonl_io.py
+from typing import Iterator
+
+CHUNK_BYTES = 1 << 20
+
+
+def iter_raw_lines(path: str, chunk_size: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Yields every line of `path` as raw bytes (newline stripped, blank lines
+    included so enumerate() still gives file line numbers). Reads 1 MB binary
+    chunks and splits on b"\\n": no per-line decode or text-mode bookkeeping;
+    feed the lines straight to orjson.loads.
+    """
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            yield from lines
+        if tail:
+            yield tail
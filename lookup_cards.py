@@ -12,11 +12,15 @@
 #   tmp/match_review.csv    (easy manual review sheet)
 
 import os
-import json
 import csv
+from contextlib import closing
 from typing import Any, Dict, Optional
 
-from lookup_pc_fuzzy import lookup_best_match
+import orjson
+
+from jsonl_io import iter_raw_lines
+
+from lookup_pc_fuzzy import lookup_best_match, open_lookup_db
 
 DB_PATH = "pricecharting.db"
 IN_JSONL = "tmp/card_identifications.jsonl"
@@ -56,26 +60,32 @@ def run(
     top_k: int = 10,
     min_name_score: int = 70,
     start_at: int = 0,
+    name_score_cutoff: int = 50,
 ):
     """
     min_name_score: if best match score is below this, flag for review.
                     (Score here is name-heavy; tune after first run.)
+    name_score_cutoff: fuzzy name scores below this count as 0. Keep it low enough
+                    that 0.85 * cutoff + 15 < min_name_score, so it never changes
+                    which rows get flagged.
     start_at: resume from a line index in IN_JSONL (0-based).
     """
     os.makedirs("tmp", exist_ok=True)
 
     review_rows = []
 
-    with open(IN_JSONL, "r", encoding="utf-8") as fin, open(OUT_JSONL, "w", encoding="utf-8") as fout:
-        for idx, line in enumerate(fin):
+    # one connection for the whole batch instead of one per card
+    con = open_lookup_db(DB_PATH)
+
+    with closing(con), open(OUT_JSONL, "wb") as fout:
+        for idx, line in enumerate(iter_raw_lines(IN_JSONL)):
             if idx < start_at:
                 continue
 
-            line = line.strip()
-            if not line:
+            if not line.strip():
                 continue
 
-            rec: Dict[str, Any] = json.loads(line)
+            rec: Dict[str, Any] = orjson.loads(line)
 
             img = rec.get("image") or rec.get("front_local") or rec.get("path")
             name = (rec.get("card_name") or "").strip()
@@ -91,6 +101,8 @@ def run(
                 set_size=set_size,
                 copyright_year=year,
                 top_k=top_k,
+                con=con,
+                score_cutoff=name_score_cutoff,
             )
 
             best = matches[0] if matches else None
@@ -122,7 +134,7 @@ def run(
                 "needs_review": needs_review,
             }
 
-            fout.write(json.dumps(out, ensure_ascii=False) + "\n")
+            fout.write(orjson.dumps(out, option=orjson.OPT_APPEND_NEWLINE))
 
             review_rows.append({
                 "idx": idx,
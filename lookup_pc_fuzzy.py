@@ -1,12 +1,17 @@
 # lookup_pc_fuzzy.py
+import heapq
 import re
 import sqlite3
-from rapidfuzz import fuzz
+from collections import OrderedDict
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 
 # -----------------------
 # Helpers
 # -----------------------
 
+_NUM_RE = re.compile(r"(\d{1,4})")
+
 def extract_x(collector_text):
     """
     "103/165" -> 103
@@ -14,71 +19,49 @@ def extract_x(collector_text):
     """
     if not collector_text:
         return None
-    m = re.search(r"(\d{1,4})", str(collector_text))
+    if type(collector_text) is int and 0 < collector_text <= 9999:
+        return collector_text  # already a bare number
+    m = _NUM_RE.search(str(collector_text))
     return int(m.group(1)) if m else None
 
 # -----------------------
-# Candidate set filtering
+# Card lookup
 # -----------------------
 
-def get_candidate_set_slugs(con,
-                            set_size: int | None,
-                            copyright_year: int | None):
-    where = ["language = 'English'"]
-    params = []
+def fetch_candidates(con,
+                     set_size: int | None,
+                     copyright_year: int | None,
+                     num_x):
+    """
+    One join does both passes: English sets whose base_total / released_year
+    (year or year-1) fit, and their cards with the matching card_number_int
+    (see ensure_card_number_int).
+    """
+
+    if num_x is None:
+        return []
+
+    where = ["s.language = 'English'", "c.card_number_int = ?"]
+    params = [int(num_x)]
 
     if set_size is not None:
-        where.append("base_total = ?")
+        where.append("s.base_total = ?")
         params.append(int(set_size))
 
     if copyright_year is not None:
-        where.append("(released_year = ? OR released_year = ?)")
+        where.append("(s.released_year = ? OR s.released_year = ?)")
         params.extend([int(copyright_year), int(copyright_year) - 1])
 
-    sql = f"""
-        SELECT set_slug
-        FROM set_meta
-        WHERE {" AND ".join(where)}
-    """
-
-    cur = con.cursor()
-    cur.execute(sql, params)
-    return [r[0] for r in cur.fetchall()]
-
-# -----------------------
-# Card lookup
-# -----------------------
-
-def fetch_candidates(con,
-                     set_slugs,
-                     num_x):
-
-    if not set_slugs or num_x is None:
-        return []
-
-    placeholders = ",".join(["?"] * len(set_slugs))
-    n = str(num_x)
-    n3 = n.zfill(3)
-    print(n)
-    print(n3)
-    print(set_slugs)
-    
     cur = con.cursor()
     cur.execute(f"""
-        SELECT card_name, card_number, card_url,
-               ungraded_price, grade9_price, psa10_price,
-               set_slug, set_url
-        FROM cards
-        WHERE set_slug in ({placeholders})
-          AND (
-                card_number = ?
-             OR card_number = ?
-             OR card_number LIKE ?
-             OR card_number LIKE ?
-          )""", (*set_slugs, n, n3, f"%{n}%", f"%{n3}%"))
-    
+        SELECT c.card_name, c.card_number, c.card_url,
+               c.ungraded_price, c.grade9_price, c.psa10_price,
+               c.set_slug, c.set_url
+        FROM cards c
+        JOIN set_meta s ON s.set_slug = c.set_slug
+        WHERE {" AND ".join(where)}""", params)
+
     rows = cur.fetchall()
-    #print(rows)
     dedup = {}
     for r in rows:
         dedup[r[2]] = r
@@ -88,10 +71,25 @@ def fetch_candidates(con,
 # Ranking
 # -----------------------
 
-def rank_candidates(card_name, num_x, candidates, top_k=10):
+def rank_candidates(card_name, num_x, candidates, top_k=10, score_cutoff=0):
+    """
+    score_cutoff: name scores below this are treated as 0, which lets rapidfuzz
+                  bail out of hopeless comparisons early.
+    """
+    # one C-level pass scores every candidate name (limit=None keeps them all,
+    # since the final rank also mixes in the number score)
+    name_scores = [0.0] * len(candidates)
+    if card_name:
+        # normalize (lowercase, strip punctuation) once per string, then tell
+        # the scorer not to redo it for every pair
+        query = default_process(card_name)
+        names = [default_process(c[0] or "") for c in candidates]
+        for _, score, i in process.extract(query, names, scorer=fuzz.WRatio, processor=None,
+                                           limit=None, score_cutoff=score_cutoff):
+            name_scores[i] = score
+
     scored = []
-    for cname, cnum, url, ungraded, g9, psa10, set_slug, set_url in candidates:
-        name_score = fuzz.WRatio(card_name, cname) if card_name else 0
+    for (cname, cnum, url, ungraded, g9, psa10, set_slug, set_url), name_score in zip(candidates, name_scores):
         cand_x = extract_x(cnum)
         num_score = 100 if cand_x == num_x else 0
 
@@ -99,10 +97,9 @@ def rank_candidates(card_name, num_x, candidates, top_k=10):
 
         scored.append((combined, cname, cnum, url, ungraded, g9, psa10, set_slug, set_url))
 
-    scored.sort(reverse=True, key=lambda x: x[0])
-
     out = []
-    for combined, cname, cnum, url, ungraded, g9, psa10, set_slug, set_url in scored[:top_k]:
+    # top_k only: O(n log k), same (stable) order as a full reverse sort
+    for combined, cname, cnum, url, ungraded, g9, psa10, set_slug, set_url in heapq.nlargest(top_k, scored, key=lambda x: x[0]):
         out.append({
             "score": combined,
             "card_name": cname,
@@ -120,32 +117,108 @@ def rank_candidates(card_name, num_x, candidates, top_k=10):
 # Public API
 # -----------------------
 
+LOOKUP_INDEXES = {
+    # fetch_candidates join: language/base_total/released_year filter, set_slug covered
+    "idx_set_meta_filter": "set_meta(language, base_total, released_year, set_slug)",
+    # fetch_candidates join probe: set_slug = s.set_slug AND card_number_int = ?
+    "idx_cards_slug_num_int": "cards(set_slug, card_number_int)",
+}
+
+def ensure_card_number_int(con):
+    """
+    cards.card_number_int = extract_x(card_number) ("045" -> 45, "TG05" -> 5),
+    so fetch_candidates can match on an indexed integer instead of LIKE '%n%'.
+    The scrapers' upserts only rewrite card_number, so every row whose stored
+    value no longer matches (new rows, corrected numbers) is recomputed here.
+    """
+    cols = {r[1] for r in con.execute("PRAGMA table_info(cards)")}
+    if "card_number_int" not in cols:
+        con.execute("ALTER TABLE cards ADD COLUMN card_number_int INTEGER")
+    con.create_function("extract_x", 1, extract_x, deterministic=True)
+    con.execute("""
+        UPDATE cards SET card_number_int = extract_x(card_number)
+        WHERE card_number_int IS NOT extract_x(card_number)
+    """)
+    con.commit()
+
+def ensure_lookup_indexes(con):
+    """Creates the lookup indexes once; ANALYZE only runs when one was missing."""
+    ensure_card_number_int(con)
+    con.execute("DROP INDEX IF EXISTS idx_cards_slug_num")  # superseded by idx_cards_slug_num_int
+    have = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    missing = [name for name in LOOKUP_INDEXES if name not in have]
+    for name in missing:
+        con.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {LOOKUP_INDEXES[name]}")
+    if missing:
+        con.execute("ANALYZE")
+    con.commit()
+
+def open_lookup_db(db_path):
+    """
+    Read-mostly connection for a whole lookup batch: open it once and pass it
+    to lookup_best_match(con=...) so the schema and page cache stay warm.
+    """
+    con = sqlite3.connect(db_path)
+    con.execute("PRAGMA mmap_size=268435456")
+    con.execute("PRAGMA cache_size=-65536")
+    con.execute("PRAGMA temp_store=MEMORY")
+    ensure_lookup_indexes(con)
+    return con
+
+# Repeated listings produce identical lookups; keep the ranked result for the
+# most recent MATCH_CACHE_SIZE distinct inputs.
+MATCH_CACHE_SIZE = 4096
+_MATCH_CACHE: "OrderedDict[tuple, list[dict]]" = OrderedDict()
+
 def lookup_best_match(db_path,
                       card_name,
                       collector_number,
                       set_size,
                       copyright_year,
-                      top_k=10):
+                      top_k=10,
+                      con=None,
+                      score_cutoff=0):
+    """
+    con: optional shared connection (see open_lookup_db); when omitted a
+         connection to db_path is opened and closed for this one lookup.
+    score_cutoff: passed to rank_candidates.
+    """
 
     num_x = extract_x(collector_number)
 
-    con = sqlite3.connect(db_path)
+    # key on what actually drives the result: normalized name, numerator, filters
+    key = (
+        db_path,
+        default_process(card_name) if card_name else "",
+        num_x,
+        None if set_size is None else int(set_size),
+        None if copyright_year is None else int(copyright_year),
+        top_k,
+        score_cutoff,
+    )
+    hit = _MATCH_CACHE.get(key)
+    if hit is not None:
+        _MATCH_CACHE.move_to_end(key)
+        return [dict(m) for m in hit]
+
+    own_con = con is None
+    if own_con:
+        # same setup as a shared connection: card_number_int + lookup indexes
+        con = open_lookup_db(db_path)
     try:
-        set_slugs = get_candidate_set_slugs(
-            con,
-            set_size=set_size,
-            copyright_year=copyright_year
-        )
         candidates = fetch_candidates(
             con,
-            set_slugs=set_slugs,
+            set_size=set_size,
+            copyright_year=copyright_year,
             num_x=num_x
         )
     finally:
-        con.close()
-
-    if not candidates:
-        return []
+        if own_con:
+            con.close()
 
-    return rank_candidates(card_name, num_x, candidates, top_k)
+    matches = rank_candidates(card_name, num_x, candidates, top_k, score_cutoff) if candidates else []
 
+    _MATCH_CACHE[key] = matches
+    if len(_MATCH_CACHE) > MATCH_CACHE_SIZE:
+        _MATCH_CACHE.popitem(last=False)
+    return [dict(m) for m in matches]
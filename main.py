@@ -1,5 +1,5 @@
 import sys
-import json
+import orjson
 from identify_card import identify_card
 from query_google import google_first_pricecharting_game_url
 from pricecharting import (
@@ -18,8 +18,9 @@ def main():
     card = identify_card(image_path)
     print("Card JSON:", card)
 
-    # convert string output into json
-    card = json.loads(card)
+    # convert string output into json (identify_card already returns a dict)
+    if isinstance(card, (str, bytes)):
+        card = orjson.loads(card)
     # 2) Build PriceCharting query
     query = format_search_query(card)
     print("Search Query:", query)
@@ -1,10 +1,25 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree, html
+from requests.adapters import HTTPAdapter
 import urllib.parse
 import re
 
 PRICE_RE = re.compile(r"\$?\s*([0-9]+(?:\.[0-9]{1,2})?)")
 
+ASYNC_CONCURRENCY = 32
+
+# keep-alive pool: the TLS handshake is paid once per connection, not per price
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# table#price_data td#used_price span.price (class matched as a token, like CSS)
+_UNGRADED_PRICE_XPATH = etree.XPath(
+    '//table[@id="price_data"]//td[@id="used_price"]'
+    '//span[contains(concat(" ", normalize-space(@class), " "), " price ")]'
+)
+
 def format_search_query(card_json: dict) -> str:
     name = card_json.get("card_name", "").strip()
     number = card_json.get("collector_number", "").strip()
@@ -18,20 +33,59 @@ def format_search_query(card_json: dict) -> str:
     return f"{name} {number}"
 
 
-def fetch_pricecharting_ungraded_price(product_url: str) -> float:
-    headers = {"User-Agent": "Mozilla/5.0"}
-    r = requests.get(product_url, headers=headers, timeout=20)
-    r.raise_for_status()
-
-    soup = BeautifulSoup(r.text, "html.parser")
-    price_el = soup.select_one("table#price_data td#used_price span.price")
+def parse_ungraded_price(content: bytes) -> float:
+    tree = html.fromstring(content)
+    found = _UNGRADED_PRICE_XPATH(tree)
 
-    if not price_el:
+    if not found:
         raise RuntimeError("Ungraded price not found")
 
-    m = PRICE_RE.search(price_el.text)
+    text = found[0].text_content()
+    # the span is normally just "$12.34": strip and cast, regex only as a fallback
+    try:
+        return float(text.strip().lstrip("$").replace(",", ""))
+    except ValueError:
+        pass
+
+    m = PRICE_RE.search(text)
     if not m:
         raise RuntimeError("Could not parse price")
 
     return float(m.group(1))
 
+
+def fetch_pricecharting_ungraded_price(product_url: str) -> float:
+    r = _SESSION.get(product_url, timeout=20)
+    r.raise_for_status()
+
+    return parse_ungraded_price(r.content)
+
+
+async def fetch_price_async(client, product_url: str) -> float:
+    """client: a shared httpx.AsyncClient (see fetch_prices_async)."""
+    r = await client.get(product_url, timeout=20)
+    r.raise_for_status()
+
+    return parse_ungraded_price(r.content)
+
+
+async def fetch_prices_async(product_urls, concurrency: int = ASYNC_CONCURRENCY):
+    """
+    Ungraded prices for many product pages over one HTTP/2 connection pool,
+    at most `concurrency` requests in flight. Results follow `product_urls`;
+    a failed page yields its exception instead of a price.
+    """
+    import httpx
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(client, url):
+        async with sem:
+            return await fetch_price_async(client, url)
+
+    async with httpx.AsyncClient(
+        http2=True,
+        headers=dict(_SESSION.headers),
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as client:
+        return await asyncio.gather(*(one(client, u) for u in product_urls), return_exceptions=True)
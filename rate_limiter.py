@@ -0,0 +1,43 @@
+# rate_limiter.py
+import asyncio
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    Token bucket shared by worker threads: at most `rate` acquires per second,
+    with bursts of up to `burst`.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _try_take(self) -> float:
+        """Takes a token and returns 0, or returns how long to wait for the next one."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._try_take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Same as acquire(), but yields to the event loop instead of blocking it."""
+        while True:
+            wait = self._try_take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
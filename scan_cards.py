@@ -3,6 +3,9 @@ import pytesseract
 import pandas as pd
 import re
 import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 # Uncomment if Windows + tesseract not on PATH
 # pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
@@ -38,11 +41,12 @@ def crop_bottom_left(img, width_pct=0.4, height_pct=0.25):
         0:int(w*width_pct)
     ]
 
-def extract_set_and_number(path):
+def extract_set_and_number(path, debug_crop=True):
     img = cv2.imread(path)
     crop = crop_bottom_left(img, 0.40, 0.15)
     prep = preprocess(crop)
-    cv2.imwrite("debug_crop.png", prep)
+    if debug_crop:
+        cv2.imwrite("debug_crop.png", prep)
     text = ocr_region(prep)
     print(text)
 
@@ -58,19 +62,28 @@ def extract_set_and_number(path):
 
     return None, None, None, text
 
+def _init_ocr_worker():
+    # one OpenCV thread per process; the pool already fills every core
+    cv2.setNumThreads(1)
+
 if __name__ == "__main__":
     rows = []
+    paths = sorted(glob.glob("/media/sf_VM_shared/cards/*.png"))
 
-    for p in glob.glob("/media/sf_VM_shared/cards/*.png"):
-        set_code, region, number, raw = extract_set_and_number(p)
+    # OpenCV preprocessing + the tesseract subprocess are CPU-bound per image;
+    # map() keeps results in path order. The shared debug_crop.png is skipped
+    # here since parallel workers would just overwrite each other.
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_ocr_worker) as ex:
+        results = ex.map(partial(extract_set_and_number, debug_crop=False), paths, chunksize=4)
 
-        rows.append({
-            "image": p,
-            "set_code": set_code,
-            "region": region,
-            "collector_number": number,
-            "ocr_raw": raw
-        })
+        for p, (set_code, region, number, raw) in zip(paths, results):
+            rows.append({
+                "image": p,
+                "set_code": set_code,
+                "region": region,
+                "collector_number": number,
+                "ocr_raw": raw
+            })
 
     df = pd.DataFrame(rows)
     df.to_csv("card_index.csv", index=False)
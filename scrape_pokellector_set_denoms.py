@@ -1,18 +1,50 @@
+import asyncio
 import csv
+import hashlib
 import json
 import re
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from lxml import etree, html as lxml_html
+
+from rate_limiter import RateLimiter
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; pokellector-denom-scraper/0.1)"
 }
+MAX_WORKERS = 8
+ASYNC_CONCURRENCY = 16
+CACHE_DB = "pokellector_cache.db"
+# cached rows younger than this are reused without any request at all
+SCRAPE_CACHE_TTL_S = 24 * 3600
+
+# keep-alive pool shared by every fetch and the worker threads
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+_CARDS_DIV = etree.XPath('(//div[contains(concat(" ", normalize-space(@class), " "), " cards ")])[1]')
+_NEXT_DIV = etree.XPath("following-sibling::div[1]")
+
+_DIGITS = re.compile(r"(\d+)")
+_SECRET = re.compile(r"\+?\s*(\d+)\s*Secret", re.IGNORECASE)
+_YEAR = re.compile(r"(\d{4})")
 
-def parse_cards_and_release(html: str):
+def _text(el, sep: str = "") -> str:
+    # same as BeautifulSoup's get_text(sep, strip=True)
+    return sep.join(t.strip() for t in el.itertext() if t.strip())
+
+def parse_cards_and_release(html):
     """
+    html: page HTML, or an already-parsed lxml document of it (parse_set_page
+    passes its document so the page is only parsed once).
+
     Parses:
       <div class="cards">
         <span>Cards</span>
@@ -30,9 +62,9 @@ def parse_cards_and_release(html: str):
     Returns dict:
       base_total, secret_total, released_md, released_year, released_raw
     """
-    soup = BeautifulSoup(html, "html.parser")
-    cards_div = soup.select_one("div.cards")
-    if not cards_div:
+    doc = lxml_html.fromstring(html) if isinstance(html, (str, bytes)) else html
+    found = _CARDS_DIV(doc)
+    if not found:
         return {
             "base_total": None,
             "secret_total": None,
@@ -41,18 +73,20 @@ def parse_cards_and_release(html: str):
             "released_raw": None,
         }
 
+    cards_div = found[0]
+
     # --- Cards ---
-    spans = cards_div.find_all("span")
+    spans = cards_div.findall(".//span")
     base_total = None
     if len(spans) >= 2:
-        txt = spans[1].get_text(strip=True)
-        m = re.search(r"(\d+)", txt)
+        txt = _text(spans[1])
+        m = _DIGITS.search(txt)
         base_total = int(m.group(1)) if m else None
 
     secret_total = None
-    cite = cards_div.find("cite")
-    if cite:
-        m = re.search(r"\+?\s*(\d+)\s*Secret", cite.get_text(" ", strip=True), flags=re.IGNORECASE)
+    cite = cards_div.find(".//cite")
+    if cite is not None:
+        m = _SECRET.search(_text(cite, " "))
         if m:
             secret_total = int(m.group(1))
         else:
@@ -63,14 +97,15 @@ def parse_cards_and_release(html: str):
     released_year = None
     released_raw = None
 
-    next_div = cards_div.find_next_sibling("div")
-    if next_div:
-        r_spans = next_div.find_all("span")
-        if len(r_spans) >= 2 and r_spans[0].get_text(strip=True).lower() == "released":
-            released_md = r_spans[1].get_text(strip=True)  # e.g. "Sep 1st"
-            r_cite = next_div.find("cite")
-            if r_cite:
-                m = re.search(r"(\d{4})", r_cite.get_text(strip=True))
+    next_divs = _NEXT_DIV(cards_div)
+    if next_divs:
+        next_div = next_divs[0]
+        r_spans = next_div.findall(".//span")
+        if len(r_spans) >= 2 and _text(r_spans[0]).lower() == "released":
+            released_md = _text(r_spans[1])  # e.g. "Sep 1st"
+            r_cite = next_div.find(".//cite")
+            if r_cite is not None:
+                m = _YEAR.search(_text(r_cite))
                 released_year = int(m.group(1)) if m else None
 
             if released_md and released_year:
@@ -89,18 +124,17 @@ def parse_cards_and_release(html: str):
     }
     
 def fetch_html(url: str, timeout: int = 30) -> str:
-    r = requests.get(url, headers=HEADERS, timeout=timeout)
+    r = _SESSION.get(url, timeout=timeout)
     r.raise_for_status()
     return r.text
 
-def scrape_one_set(url: str):
-    html = fetch_html(url)
-    soup = BeautifulSoup(html, "html.parser")
+def parse_set_page(url: str, html: str):
+    doc = lxml_html.fromstring(html)
 
-    h1 = soup.find("h1")
-    set_title = h1.get_text(strip=True) if h1 else ""
+    h1 = doc.find(".//h1")
+    set_title = _text(h1) if h1 is not None else ""
 
-    meta = parse_cards_and_release(html)
+    meta = parse_cards_and_release(doc)
 
     return {
         "set_url": url,
@@ -108,6 +142,113 @@ def scrape_one_set(url: str):
         **meta,
     }
 
+def scrape_one_set(url: str):
+    return parse_set_page(url, fetch_html(url))
+
+# ---- scrape_cache: url -> validators + parsed row, so reruns only refetch changed pages ----
+
+def open_scrape_cache(db_path: str = CACHE_DB):
+    con = sqlite3.connect(db_path)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS scrape_cache (
+        url TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        html_sha TEXT,
+        scraped_at INTEGER,
+        row TEXT
+    )
+    """)
+    return con
+
+def load_scrape_cache(con) -> dict[str, dict]:
+    return {
+        url: {"etag": etag, "last_modified": lm, "html_sha": sha, "scraped_at": at, "row": orjson.loads(row)}
+        for url, etag, lm, sha, at, row in con.execute(
+            "SELECT url, etag, last_modified, html_sha, scraped_at, row FROM scrape_cache"
+        )
+    }
+
+def put_scrape_cache(con, url: str, entry: dict):
+    con.execute(
+        "INSERT OR REPLACE INTO scrape_cache (url, etag, last_modified, html_sha, scraped_at, row) VALUES (?, ?, ?, ?, ?, ?)",
+        (url, entry["etag"], entry["last_modified"], entry["html_sha"], int(time.time()), orjson.dumps(entry["row"]).decode()),
+    )
+
+def _conditional_headers(cached: dict | None) -> dict:
+    h = {}
+    if cached and cached["etag"]:
+        h["If-None-Match"] = cached["etag"]
+    if cached and cached["last_modified"]:
+        h["If-Modified-Since"] = cached["last_modified"]
+    return h
+
+def _from_response(url: str, cached: dict | None, status: int, headers, html: str):
+    """
+    Shared by both backends. Returns (meta, cache_entry); on 304 the cached
+    entry comes back unchanged so writing it just refreshes scraped_at.
+    """
+    if status == 304 and cached:
+        return cached["row"], cached
+
+    html_sha = hashlib.sha256(html.encode("utf-8")).hexdigest()
+    if cached and cached["html_sha"] == html_sha:
+        meta = cached["row"]  # server sent no validators but the page is unchanged
+    else:
+        meta = parse_set_page(url, html)
+    return meta, {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "html_sha": html_sha,
+        "row": meta,
+    }
+
+def scrape_one_set_cached(url: str, cached: dict | None = None, timeout: int = 30):
+    r = _SESSION.get(url, headers=_conditional_headers(cached), timeout=timeout)
+    if r.status_code != 304:
+        r.raise_for_status()
+    return _from_response(url, cached, r.status_code, r.headers, r.text)
+
+async def scrape_one_set_async(session, url: str, sem: asyncio.Semaphore, limiter, cached: dict | None = None):
+    async with sem:
+        if limiter:
+            await limiter.acquire_async()
+        async with session.get(url, headers=_conditional_headers(cached)) as r:
+            if r.status != 304:
+                r.raise_for_status()
+            status, headers = r.status, r.headers
+            html = await r.text() if status != 304 else ""
+    # hashing + parsing is CPU work: run it in a thread while other fetches proceed
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _from_response, url, cached, status, headers, html)
+
+async def _scrape_sets_async(todo, limiter, record, concurrency: int, cache: dict[str, dict]):
+    """
+    todo: [(i, set_row)]. Every result goes through one consumer coroutine
+    (record -> checkpoints + scrape_cache writes), so writes never race.
+    """
+    import aiohttp
+
+    sem = asyncio.Semaphore(concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def one(session, i, s):
+        try:
+            url = s["set_url"]
+            await queue.put((i, s, await scrape_one_set_async(session, url, sem, limiter, cache.get(url)), None))
+        except Exception as e:
+            await queue.put((i, s, None, e))
+
+    async def consume():
+        for _ in range(len(todo)):
+            record(*(await queue.get()))
+
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout) as session:
+        await asyncio.gather(consume(), *(one(session, i, s) for i, s in todo))
+
 def load_sets_from_jsonl(path: str):
     sets = []
     with open(path, "r", encoding="utf-8") as f:
@@ -131,9 +272,9 @@ def load_sets_from_csv(path: str):
     return sets
 
 def write_jsonl(path: str, rows: list[dict]):
-    with open(path, "w", encoding="utf-8") as f:
+    with open(path, "wb") as f:
         for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            f.write(orjson.dumps(r, option=orjson.OPT_APPEND_NEWLINE))
 
 def write_csv(path: str, rows: list[dict]):
     if not rows:
@@ -146,13 +287,52 @@ def write_csv(path: str, rows: list[dict]):
         for r in rows:
             w.writerow({k: r.get(k, "") for k in cols})
 
+def _ok_row(s: dict, meta: dict) -> dict:
+    return {
+        "set_code": s.get("set_code", ""),
+        "set_name": s.get("set_name", ""),
+        "set_url": s["set_url"],
+        "set_title": meta.get("set_title", ""),
+        "base_total": meta.get("base_total"),
+        "secret_total": meta.get("secret_total"),
+        "released_md": meta.get("released_md"),
+        "released_year": meta.get("released_year"),
+        "released_raw": meta.get("released_raw")
+    }
+
+def _error_row(s: dict, e: Exception) -> dict:
+    return {
+        "set_code": s.get("set_code", ""),
+        "set_name": s.get("set_name", ""),
+        "set_url": s["set_url"],
+        "set_title": "",
+        "base_total": None,
+        "secret_total": None,
+        "released_md": None,
+        "released_year": None,
+        "released_raw": None,
+        "error": str(e),
+    }
+
 def main(
     input_path: str = "pokellector_sets.jsonl",
     out_jsonl: str = "pokellector_set_denoms.jsonl",
     out_csv: str = "pokellector_set_denoms.csv",
     sleep_s: float = 0.8,
     start_at: int = 0,
+    max_workers: int = MAX_WORKERS,
+    backend: str = "threads",  # "threads" (requests) or "aiohttp" (asyncio)
+    cache_db: str | None = CACHE_DB,
+    cache_max_age_s: int = SCRAPE_CACHE_TTL_S,
 ):
+    """
+    sleep_s: minimum spacing between requests, enforced globally across the
+             workers by a shared RateLimiter (0 disables it).
+    cache_db: sqlite scrape_cache; pages answering 304 (or with unchanged HTML)
+              reuse the cached row. None fetches and parses everything.
+    cache_max_age_s: rows fetched/revalidated within this window skip the
+                     network entirely (0 always revalidates).
+    """
     input_path = str(input_path)
     if input_path.endswith(".jsonl"):
         sets = load_sets_from_jsonl(input_path)
@@ -163,50 +343,71 @@ def main(
 
     print(f"Loaded {len(sets)} sets from {input_path}")
 
-    results = []
-    for i, s in enumerate(sets[start_at:], start=start_at):
-        url = s["set_url"]
-        try:
-            meta = scrape_one_set(url)
-            row = {
-                "set_code": s.get("set_code", ""),
-                "set_name": s.get("set_name", ""),
-                "set_url": url,
-                "set_title": meta.get("set_title", ""),
-                "base_total": meta.get("base_total"),
-                "secret_total": meta.get("secret_total"),
-                "released_md": meta.get("released_md"),
-                "released_year": meta.get("released_year"),
-                "released_raw": meta.get("released_raw")
-            }
-            results.append(row)
+    limiter = RateLimiter(1.0 / sleep_s) if sleep_s > 0 else None
+    todo = list(enumerate(sets[start_at:], start=start_at))
+
+    cache_con = open_scrape_cache(cache_db) if cache_db else None
+    cache = load_scrape_cache(cache_con) if cache_con else {}
+
+    # results keyed by input position so output keeps input order
+    results: dict[int, dict] = {}
+
+    def ordered():
+        return [results[k] for k in sorted(results)]
+
+    def record(i, s, result, err):
+        if err is None:
+            meta, entry = result
+            if entry and cache_con:
+                put_scrape_cache(cache_con, s["set_url"], entry)
+            row = _ok_row(s, meta)
             print(f"[{i}] OK  {row['set_name'] or row['set_title']}  base={row['base_total']}  secret={row['secret_total']}, release_raw={row['released_raw']}")
-        except Exception as e:
-            row = {
-                "set_code": s.get("set_code", ""),
-                "set_name": s.get("set_name", ""),
-                "set_url": url,
-                "set_title": "",
-                "base_total": None,
-                "secret_total": None,
-                "released_md": None,
-                "released_year": None,
-                "released_raw": None,
-                "error": str(e),
-            }
-            results.append(row)
-            print(f"[{i}] FAIL {s.get('set_name','')}  {url}  err={e}")
-
-        time.sleep(sleep_s)
+        else:
+            row = _error_row(s, err)
+            print(f"[{i}] FAIL {s.get('set_name','')}  {s['set_url']}  err={err}")
+        results[i] = row
 
         # write progress every 25 sets so you can resume safely
-        if (i + 1) % 25 == 0:
-            write_jsonl(out_jsonl, results)
-            write_csv(out_csv, results)
+        if len(results) % 25 == 0:
+            write_jsonl(out_jsonl, ordered())
+            write_csv(out_csv, ordered())
+            if cache_con:
+                cache_con.commit()
             print(f"Checkpoint wrote {len(results)} rows")
 
-    write_jsonl(out_jsonl, results)
-    write_csv(out_csv, results)
+    # fresh cache rows short-circuit before the rate limiter or any request
+    fresh_after = time.time() - cache_max_age_s
+    fetch_todo = []
+    for i, s in todo:
+        cached = cache.get(s["set_url"])
+        if cached and cached["scraped_at"] > fresh_after:
+            record(i, s, (cached["row"], None), None)
+        else:
+            fetch_todo.append((i, s))
+    todo = fetch_todo
+
+    if backend == "aiohttp":
+        asyncio.run(_scrape_sets_async(todo, limiter, record, ASYNC_CONCURRENCY, cache))
+    else:
+        def fetch(url):
+            if limiter:
+                limiter.acquire()
+            return scrape_one_set_cached(url, cache.get(url))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            futures = {ex.submit(fetch, s["set_url"]): (i, s) for i, s in todo}
+            for fut in as_completed(futures):
+                i, s = futures[fut]
+                try:
+                    record(i, s, fut.result(), None)
+                except Exception as e:
+                    record(i, s, None, e)
+
+    write_jsonl(out_jsonl, ordered())
+    write_csv(out_csv, ordered())
+    if cache_con:
+        cache_con.commit()
+        cache_con.close()
     print("Done.")
     print("Wrote:", out_jsonl)
     print("Wrote:", out_csv)
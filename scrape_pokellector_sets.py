@@ -1,9 +1,11 @@
 # scrape_pokellector_sets.py
 import csv
-import json
 import time
+
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser
 from urllib.parse import urljoin
 
 BASE = "https://www.pokellector.com"
@@ -13,31 +15,37 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; card-indexer/0.1; +https://example.com)"
 }
 
+# keep-alive pool reused across fetches
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 
 def parse_sets_from_html(base_url=BASE) -> list[dict]:
-    r = requests.get(INDEX_URL, headers=HEADERS, timeout=30)
+    r = _SESSION.get(INDEX_URL, timeout=30)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
+    tree = LexborHTMLParser(r.text)
 
     sets = []
     # EXACT selector per your snippet
-    for a in soup.select("div.content.buttonlisting.english a.button[href]"):
-        set_code = (a.get("name") or "").strip()
-        href = (a.get("href") or "").strip()
-        title = (a.get("title") or "").strip()
+    for a in tree.css("div.content.buttonlisting.english a.button[href]"):
+        attrs = a.attributes
+        set_code = (attrs.get("name") or "").strip()
+        href = (attrs.get("href") or "").strip()
+        title = (attrs.get("title") or "").strip()
 
         # Name is in the <span>
-        span = a.find("span")
-        set_name = span.get_text(strip=True) if span else a.get_text(" ", strip=True)
+        span = a.css_first("span")
+        set_name = span.text(strip=True) if span else a.text(separator=" ", strip=True)
 
         # Images: first img = logo, img.symbol = symbol
         logo_url = ""
         symbol_url = ""
-        for img in a.find_all("img"):
-            src = (img.get("src") or "").strip()
+        for img in a.css("img"):
+            src = (img.attributes.get("src") or "").strip()
             if not src:
                 continue
-            classes = img.get("class") or []
+            classes = (img.attributes.get("class") or "").split()
             if "symbol" in classes:
                 symbol_url = src
             elif not logo_url:
@@ -70,9 +78,9 @@ def write_csv(path: str, rows: list[dict]):
 
 
 def write_jsonl(path: str, rows: list[dict]):
-    with open(path, "w", encoding="utf-8") as f:
+    with open(path, "wb") as f:
         for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            f.write(orjson.dumps(r, option=orjson.OPT_APPEND_NEWLINE))
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import csv
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
@@ -8,11 +9,16 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# keep-alive pool reused across fetches
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 def scrape_set_links(category_url: str):
-    r = requests.get(category_url, headers=HEADERS, timeout=30)
+    r = _SESSION.get(category_url, timeout=30)
     r.raise_for_status()
 
-    soup = BeautifulSoup(r.text, "html.parser")
+    soup = BeautifulSoup(r.text, "lxml")
 
     box = soup.select_one("div.home-box.all")
     if not box:
@@ -2,17 +2,24 @@ import sqlite3
 
 DB_PATH = "pricecharting.db"
 
+# (set_slug, base_total) corrections for set_meta
+PATCHES = [
+    ("pokemon-journey-together", 159),
+]
+
 con = sqlite3.connect(DB_PATH)
 cur = con.cursor()
+cur.execute("PRAGMA journal_mode=WAL")
+cur.execute("PRAGMA synchronous=NORMAL")
 
-cur.execute("""
-UPDATE set_meta
-SET base_total = 159
-WHERE set_slug = 'pokemon-journey-together'
-""")
+# one transaction (one fsync) for every patch
+cur.executemany(
+    "UPDATE set_meta SET base_total = ? WHERE set_slug = ?",
+    [(total, slug) for slug, total in PATCHES],
+)
 
 con.commit()
 con.close()
 
-print("Updated Journey Together base_total to 159")
-
+for slug, total in PATCHES:
+    print(f"Updated {slug} base_total to {total}")
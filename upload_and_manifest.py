@@ -12,6 +12,7 @@ Scaling + safety improvements:
   - Organize uploaded objects under prefix derived from local folder structure: set/finish/date
   - Add deterministic content hash to object names to prevent overwriting prior uploads
   - Skip upload if object already exists (idempotent). This lets you re-run safely.
+    Existing names come from one bucket listing under the prefix.
 
 Expected local folder structure (what YOU described):
   <root>/<set>/<finish>/<date>/   <-- script reads THIS leaf folder
@@ -26,12 +27,15 @@ Object path in bucket becomes:
 
 import os
 import sys
-import json
-import mimetypes
 import hashlib
+import mmap
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Tuple, Optional
+
+import orjson
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 
 # ---- config ----
 BUCKET = "ebay-automate-picture-hosting"   # bucket should be public-readable for eBay PicURL
@@ -39,12 +43,17 @@ OUT_MANIFEST = "tmp/upload_manifest.jsonl"
 
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
 
+# hashing + uploads are disk/network bound; run this many at once
+UPLOAD_WORKERS = 16
+
 
 def list_images_in_order(folder: str) -> List[Path]:
-    files = [
-        p for p in Path(folder).iterdir()
-        if p.is_file() and p.suffix.lower() in IMAGE_EXTS
-    ]
+    # DirEntry.is_file() uses the type cached by the directory read (no stat per file)
+    with os.scandir(folder) as it:
+        files = [
+            Path(e.path) for e in it
+            if e.is_file() and os.path.splitext(e.name)[1].lower() in IMAGE_EXTS
+        ]
     files.sort(key=lambda p: p.name)  # deterministic order by filename sort
     return files
 
@@ -59,21 +68,42 @@ def pair_front_back(files: List[Path]) -> List[Tuple[Path, Path]]:
 
 
 def sha256_12(path: Path) -> str:
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
+        if hasattr(hashlib, "file_digest"):  # 3.11+: hashed in C, no per-chunk Python loop
+            h = hashlib.file_digest(f, "sha256")
+        else:
+            h = hashlib.sha256()
+            if os.fstat(f.fileno()).st_size:  # mmap can't map an empty file
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm)
     return h.hexdigest()[:12]
 
 
+# covers IMAGE_EXTS; a dict lookup instead of a mimetypes database scan per file
+_CTYPE = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
+
+
 def guess_content_type(local_path: Path) -> str:
-    ctype, _ = mimetypes.guess_type(str(local_path))
-    return ctype or "image/jpeg"
+    return _CTYPE.get(local_path.suffix.lower(), "image/jpeg")
+
+
+class _SanitizeTable(dict):
+    """
+    str.translate table: drops any code point that isn't alnum or "-_./",
+    keeps the rest. Filled lazily per code point, so it matches the old
+    isalnum() filter for all of Unicode; later lookups stay in C.
+    """
+    def __missing__(self, i):
+        ch = chr(i)
+        self[i] = v = i if ch.isalnum() or ch in "-_./" else None
+        return v
+
+
+_SANITIZE = _SanitizeTable()
 
 
 def sanitize(seg: str) -> str:
-    seg = (seg or "").strip().lower().replace(" ", "-")
-    seg = "".join(ch for ch in seg if ch.isalnum() or ch in "-_./")
+    seg = (seg or "").strip().lower().replace(" ", "-").translate(_SANITIZE)
     seg = seg.strip("/").strip(".")
     return seg or "unknown"
 
@@ -93,23 +123,39 @@ def infer_prefix_from_path(images_dir: str) -> str:
     return sanitize(p.name)
 
 
-def upload_file_if_missing(bucket, local_path: Path, object_name: str) -> str:
+def object_url(bucket, object_name: str) -> str:
+    return f"https://storage.googleapis.com/{bucket.name}/{object_name}"
+
+
+def object_name_for(local_path: Path, prefix: str, idx: int, side: str) -> str:
     """
-    Upload only if the object doesn't already exist.
-    Returns the public URL either way.
+    side: "front" or "back".
     """
-    blob = bucket.blob(object_name)
+    # deterministic, unique object names
+    return f"{prefix}/{idx:04d}_{side}_{sha256_12(local_path)}{local_path.suffix.lower()}"
+
 
-    # Idempotency: if exists, do NOT overwrite.
-    # This prevents existing eBay listings from changing.
-    if blob.exists():
-        return f"https://storage.googleapis.com/{bucket.name}/{object_name}"
+def upload_missing(bucket, uploads: List[Tuple[Path, str]]) -> None:
+    """
+    uploads: [(local_path, object_name)] not already in the bucket.
 
-    blob.upload_from_filename(
-        str(local_path),
-        content_type=guess_content_type(local_path)
+    Uploads in parallel through the GCS transfer manager. skip_if_exists sends
+    each upload with if_generation_match=0, so an object that appeared since
+    the listing is still never overwritten (keeps existing eBay listings stable).
+    """
+    file_blob_pairs = []
+    for local_path, object_name in uploads:
+        blob = bucket.blob(object_name)
+        blob.content_type = guess_content_type(local_path)
+        file_blob_pairs.append((str(local_path), blob))
+
+    transfer_manager.upload_many(
+        file_blob_pairs,
+        skip_if_exists=True,
+        max_workers=UPLOAD_WORKERS,
+        worker_type=transfer_manager.THREAD,
+        raise_exception=True,
     )
-    return f"https://storage.googleapis.com/{bucket.name}/{object_name}"
 
 
 def main(images_dir: str, out_manifest: str = OUT_MANIFEST, prefix: Optional[str] = None):
@@ -128,20 +174,35 @@ def main(images_dir: str, out_manifest: str = OUT_MANIFEST, prefix: Optional[str
 
     prefix = sanitize(prefix) if prefix else infer_prefix_from_path(images_dir)
 
-    with open(out_manifest, "w", encoding="utf-8") as f:
-        for idx, (front, back) in enumerate(pairs, start=1):
-            # deterministic, unique object names
-            front_hash = sha256_12(front)
-            back_hash = sha256_12(back)
-
-            front_ext = front.suffix.lower()
-            back_ext = back.suffix.lower()
-
-            front_obj = f"{prefix}/{idx:04d}_front_{front_hash}{front_ext}"
-            back_obj  = f"{prefix}/{idx:04d}_back_{back_hash}{back_ext}"
+    # one paginated listing instead of a HEAD per object
+    existing = {b.name for b in client.list_blobs(BUCKET, prefix=f"{prefix}/")}
+    print(f"{len(existing)} objects already under {prefix}/")
+
+    # (idx, "front"|"back") -> object_name; hashing is disk bound, so pool it
+    objects = {}
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as ex:
+        futures = {}
+        for idx, pair in enumerate(pairs, start=1):
+            for side, path in zip(("front", "back"), pair):
+                futures[ex.submit(object_name_for, path, prefix, idx, side)] = (idx, side)
+
+        for fut in as_completed(futures):
+            objects[futures[fut]] = fut.result()
+
+    uploads = [
+        (path, objects[idx, side])
+        for idx, pair in enumerate(pairs, start=1)
+        for side, path in zip(("front", "back"), pair)
+        if objects[idx, side] not in existing
+    ]
+    print(f"Uploading {len(uploads)} of {len(objects)} images")
+    upload_missing(bucket, uploads)
 
-            front_url = upload_file_if_missing(bucket, front, front_obj)
-            back_url  = upload_file_if_missing(bucket, back, back_obj)
+    # manifest stays in listing order regardless of completion order
+    with open(out_manifest, "wb") as f:
+        for idx, (front, back) in enumerate(pairs, start=1):
+            front_obj = objects[idx, "front"]
+            back_obj = objects[idx, "back"]
 
             rec = {
                 "listing_index": idx,          # stays 1-based (same as before)
@@ -149,11 +210,10 @@ def main(images_dir: str, out_manifest: str = OUT_MANIFEST, prefix: Optional[str
                 "back_local": str(back),
                 "front_object": front_obj,
                 "back_object": back_obj,
-                "front_url": front_url,
-                "back_url": back_url,
+                "front_url": object_url(bucket, front_obj),
+                "back_url": object_url(bucket, back_obj),
             }
-            f.write(json.dumps(rec) + "\n")
-            print(f"[{idx}] uploaded/exists -> front/back")
+            f.write(orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE))
 
     print("Wrote", out_manifest)
     print("Prefix used:", prefix)
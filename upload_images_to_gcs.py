@@ -1,7 +1,8 @@
 import csv
-import mimetypes
+import os
 from pathlib import Path
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 
 BUCKET = "ebay-automate-picture-hosting"
 LOCAL_DIR = "/media/sf_VM_shared/cards/"
@@ -9,6 +10,8 @@ PREFIX = "cards/"  # you can change to "batch-001/" per run if you want
 OUT_CSV = "pic_urls.csv"
 
 ALLOWED_EXT = {".jpg", ".jpeg", ".png", ".webp"}
+UPLOAD_WORKERS = 16
+_CTYPE = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
 
 def public_url(bucket: str, blob_name: str) -> str:
     # Works when bucket objects are publicly readable
@@ -19,20 +22,34 @@ def upload_folder(bucket_name: str, local_dir: str, prefix: str, out_csv: str):
     bucket = client.bucket(bucket_name)
 
     local_dir = Path(local_dir)
-    files = sorted([p for p in local_dir.iterdir() if p.is_file() and p.suffix.lower() in ALLOWED_EXT])
+    with os.scandir(local_dir) as it:
+        files = sorted(
+            (Path(e.path) for e in it if e.is_file() and os.path.splitext(e.name)[1].lower() in ALLOWED_EXT),
+            key=lambda p: p.name,
+        )
 
-    rows = []
+    # content type set up front so the upload never falls back to a mimetypes lookup
+    file_blob_pairs = []
     for p in files:
-        blob_name = f"{prefix}{p.name}"
-        blob = bucket.blob(blob_name)
+        blob = bucket.blob(f"{prefix}{p.name}")
+        blob.content_type = _CTYPE.get(p.suffix.lower(), "image/jpeg")
+        file_blob_pairs.append((str(p), blob))
 
-        content_type, _ = mimetypes.guess_type(str(p))
-        if not content_type:
-            content_type = "image/jpeg"
+    # parallel uploads; names carry no content hash, so a new batch reusing scanner
+    # filenames must overwrite (same as the old one-by-one upload_from_filename)
+    results = transfer_manager.upload_many(
+        file_blob_pairs,
+        max_workers=UPLOAD_WORKERS,
+        worker_type=transfer_manager.THREAD,
+    )
 
-        # Upload
-        blob.upload_from_filename(str(p), content_type=content_type)
+    rows = []
+    for p, res in zip(files, results):
+        if isinstance(res, Exception):
+            print("FAILED:", p.name, "->", res)
+            continue
 
+        blob_name = f"{prefix}{p.name}"
         url = public_url(bucket_name, blob_name)
         rows.append({"filename": p.name, "gcs_path": blob_name, "picurl": url})
         print("Uploaded:", p.name, "->", url)